@@ -2,47 +2,654 @@
 AetherLink v2
 
 Significant testing
+
+selenium and bs4 are imported where they are first needed, importing this
+module stays cheap for tools that never start a browser.
 """
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from concurrent.futures import Future
+from contextlib import contextmanager
+import logging
 import time
 import pickle
 import os
-import sys
 import json
 from datetime import datetime
+from urllib.parse import urlparse
 import threading
 import re
 
+from aetherlink.console import enable_console_logging, logger, progress
+from aetherlink.history import ChatHistory, InMemoryHistory
+from aetherlink.metrics import default_metrics
+from aetherlink.network_capture import NetworkStreamCapture
+from aetherlink.packing import HistoryPacker
+from aetherlink.persistence import REQUIREMENTS_DIR, WriteBehindJson, read_json, write_pickle_atomic
+from aetherlink.procinfo import tree_rss
+from aetherlink.profile import clone_profile, remove_profile
+from aetherlink.selector_cache import SelectorCache
+from aetherlink.waits import ReadinessWaiter
+
+_INPUT_BOX_SELECTORS = [
+    "textarea[placeholder*='Message DeepSeek']",
+    "textarea[placeholder*='Message']",
+    "textarea",
+    "div[contenteditable='true']",
+    "div[role='textbox']"
+]
+
+_SEND_BUTTON_SELECTORS = [
+    "button[type='submit']",
+    "button[data-testid*='send']",
+    "button[class*='send']",
+    "button[aria-label*='send']",
+    "button[aria-label*='Send']",
+]
+
+# Match nearly any button on the page: only for clicking when Enter did not submit,
+# never for telling whether the prompt was registered
+_SEND_BUTTON_FALLBACK_SELECTORS = [
+    "button[class*='ds-icon-button']",
+    "button[class='_7436101 bcc55ca1 ds-icon-button ds-icon-button--l ds-icon-button--sizing-container ds-icon-button--disabled']",
+    "button:last-child"
+]
+
+_GENERATION_STARTED_JS = """
+var before = arguments[0];
+var hadText = arguments[1];
+if (document.querySelectorAll('[class*="ds-message"]').length > before) {
+    return true;
+}
+var input = document.querySelector('textarea') || document.querySelector("div[contenteditable='true']");
+var value = input ? (input.value !== undefined ? input.value : input.textContent) : '';
+return hadText && !value;
+"""
+
+# Starts an empty conversation inside the loaded app: new-chat control first, client-side route second
+_SPA_NEW_CHAT_JS = r"""
+var labels = /^(new chat|start a new chat|开启新对话|新对话)$/i;
+var candidates = document.querySelectorAll(
+    'a, button, [role="button"], [class*="new-chat"], [class*="newChat"], [class*="new_chat"]'
+);
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    var text = (el.textContent || el.getAttribute('aria-label') || '').replace(/\s+/g, ' ').trim();
+    var cls = el.getAttribute('class') || '';
+    if (labels.test(text) || /new[-_]?chat/i.test(cls)) {
+        if (el.offsetParent !== null) {
+            el.click();
+            return 'control';
+        }
+    }
+}
+if (location.pathname !== '/') {
+    history.pushState({}, '', '/');
+    window.dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+    return 'route';
+}
+return document.querySelectorAll('[class*="ds-message"]').length ? null : 'empty';
+"""
+
+_CHAT_EMPTY_JS = """
+return document.querySelectorAll('[class*="ds-message"]').length === 0
+    && !!(document.querySelector('textarea') || document.querySelector("div[contenteditable='true']"));
+"""
+
+# Restores saved localstorage before any page script runs; only for the saved origin
+_RESTORE_LOCALSTORAGE_JS = """
+(function (origin, items) {
+    if (location.origin !== origin) return;
+    for (var key in items) {
+        try { localStorage.setItem(key, items[key]); } catch (e) {}
+    }
+})(%s, %s);
+"""
+
+_SET_LOCALSTORAGE_JS = """
+var items = arguments[0];
+for (var key in items) {
+    try { localStorage.setItem(key, items[key]); } catch (e) {}
+}
+"""
+
+_CDP_SAME_SITE = {'strict': 'Strict', 'lax': 'Lax', 'none': 'None'}
+
+# Lean mode: Chrome features a chat automation never uses
+_LEAN_CHROME_ARGS = [
+    '--disable-extensions',
+    '--disable-gpu',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--mute-audio',
+    '--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication',
+    '--disable-site-isolation-trials',
+    '--renderer-process-limit=2',
+]
+
+# File extensions per resource type, turned into Network.setBlockedURLs patterns.
+# Stylesheets and scripts are deliberately absent: the UI checks need layout and the app.
+_RESOURCE_EXTENSIONS = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'ico', 'bmp', 'svg'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a', 'mov'],
+}
+
+_DEFAULT_BLOCKED_RESOURCES = ['image', 'font', 'media']
+
+_TRACKER_URL_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*clarity.ms*',
+    '*hotjar.com*',
+    '*sentry.io*',
+    '*segment.io*',
+    '*mixpanel.com*',
+]
+
+_SEND_BUTTON_ENABLED_JS = """
+var selectors = arguments[0];
+var seen = false;
+for (var i = 0; i < selectors.length; i++) {
+    var buttons = document.querySelectorAll(selectors[i]);
+    for (var j = 0; j < buttons.length; j++) {
+        var b = buttons[j];
+        if (b.offsetParent === null) {
+            continue;
+        }
+        seen = true;
+        var cls = b.getAttribute('class') || '';
+        if (!b.disabled && b.getAttribute('aria-disabled') !== 'true' && cls.indexOf('disabled') === -1) {
+            return true;
+        }
+    }
+}
+// No recognisable send button: nothing to wait for, the generation-start check decides
+return !seen;
+"""
+
+# Finds the newest assistant message node, mirroring the scroll-area rules of the soup fallback.
+# Returns null while the newest message is still the user's own prompt, or a reply that
+# was already on screen when the current prompt was sent (data-aetherlink-answered).
+_LOCATE_LATEST_MESSAGE_JS = r"""
+function aetherlinkMessages() {
+    function outermost(nodes) {
+        return Array.prototype.filter.call(nodes, function (node) {
+            var parent = node.parentElement;
+            return !(parent && parent.closest('[class*="ds-message"]'));
+        });
+    }
+    var areas = Array.prototype.filter.call(
+        document.querySelectorAll('[class*="ds-scroll-area"]'),
+        function (area) {
+            return !Array.prototype.some.call(area.children, function (child) {
+                return (child.getAttribute('class') || '').indexOf('ds-scroll-area__gutters') !== -1;
+            });
+        }
+    );
+    var messages = areas.length ? outermost(areas[areas.length - 1].querySelectorAll('[class*="ds-message"]')) : [];
+    if (!messages.length) {
+        messages = outermost(document.querySelectorAll('[class*="ds-message"]'));
+    }
+    if (!messages.length) {
+        messages = document.querySelectorAll('[class*="message"]');
+    }
+    if (!messages.length) {
+        messages = document.querySelectorAll('[class*="markdown"]');
+    }
+    return messages;
+}
+function aetherlinkLatestMessage() {
+    var messages = aetherlinkMessages();
+    if (!messages.length) {
+        return null;
+    }
+    function isAssistant(node) {
+        return /markdown/.test(node.getAttribute('class') || '') || !!node.querySelector('[class*="markdown"]');
+    }
+    var latest = messages[messages.length - 1];
+    if (latest.hasAttribute('data-aetherlink-answered')) {
+        return null;
+    }
+    if (isAssistant(latest)) {
+        return latest;
+    }
+    if (Array.prototype.some.call(messages, isAssistant)) {
+        return null;
+    }
+    // No markdown anywhere: unknown layout (or a fresh chat whose reply has not started).
+    // After a submit only a node past the prompt's own can be the reply.
+    var sent = document.documentElement.getAttribute('data-aetherlink-sent');
+    if (sent !== null && messages.length <= parseInt(sent, 10) + 1) {
+        return null;
+    }
+    return latest;
+}
+"""
+
+# [message count, prompt length] before sending, to tell when generation has started.
+# Also marks the reply on screen as answered, so neither its text nor its finished
+# action bar can pass for the reply to the prompt being sent, and records how many
+# messages there were (data-aetherlink-sent), so the prompt itself is never taken for one.
+_SEND_BASELINE_JS = _LOCATE_LATEST_MESSAGE_JS + """
+var answered = aetherlinkLatestMessage();
+if (answered) {
+    answered.setAttribute('data-aetherlink-answered', '1');
+}
+document.documentElement.setAttribute('data-aetherlink-sent', String(aetherlinkMessages().length));
+var input = document.querySelector('textarea') || document.querySelector("div[contenteditable='true']");
+var value = input ? (input.value !== undefined ? input.value : input.textContent) : '';
+return [document.querySelectorAll('[class*="ds-message"]').length, (value || '').length];
+"""
+
+# Converts a message node to text, keeping paragraphs, headings, lists, quotes, tables and code fences
+_MESSAGE_MARKDOWN_JS = r"""
+function aetherlinkToMarkdown(root) {
+    var SKIP = {SCRIPT: 1, STYLE: 1, NOSCRIPT: 1, BUTTON: 1, SVG: 1, TEMPLATE: 1};
+    var BLOCK = {DIV: 1, SECTION: 1, ARTICLE: 1, HEADER: 1, FOOTER: 1, FIGURE: 1, DL: 1, DT: 1, DD: 1};
+    var INDENT = '\u0001';
+    var fences = [];
+
+    function children(node, depth) {
+        var out = '';
+        for (var child = node.firstChild; child; child = child.nextSibling) {
+            out += walk(child, depth);
+        }
+        return out;
+    }
+
+    function tight(text) {
+        return text.replace(/^\s+|\s+$/g, '').replace(/\n{2,}/g, '\n');
+    }
+
+    function list(node, depth, ordered) {
+        var start = parseInt(node.getAttribute('start') || '1', 10) || 1;
+        var pad = new Array(depth + 1).join(INDENT + INDENT);
+        var lines = [];
+        var n = 0;
+        for (var i = 0; i < node.children.length; i++) {
+            var item = node.children[i];
+            if (item.tagName.toUpperCase() !== 'LI') {
+                continue;
+            }
+            var marker = ordered ? (start + n) + '. ' : '- ';
+            n++;
+            lines.push(pad + marker + tight(children(item, depth + 1)));
+        }
+        return (depth ? '\n' : '\n\n') + lines.join('\n') + (depth ? '\n' : '\n\n');
+    }
+
+    function walk(node, depth) {
+        if (node.nodeType === 3) {
+            return node.nodeValue.replace(/\s+/g, ' ');
+        }
+        if (node.nodeType !== 1) {
+            return '';
+        }
+        var tag = node.tagName.toUpperCase();
+        if (SKIP[tag]) {
+            return '';
+        }
+        if (tag === 'BR') {
+            return '\n';
+        }
+        if (tag === 'HR') {
+            return '\n\n---\n\n';
+        }
+        if (tag === 'PRE') {
+            var code = node.querySelector('code');
+            var lang = /language-([\w+#.-]+)/.exec((code && code.getAttribute('class')) || '');
+            var body = (code || node).textContent.replace(/\n+$/, '');
+            fences.push('```' + (lang ? lang[1] : '') + '\n' + body + '\n```');
+            return '\n\n\u0002' + (fences.length - 1) + '\u0002\n\n';
+        }
+        if (tag === 'CODE') {
+            return '`' + node.textContent + '`';
+        }
+        if (tag === 'UL' || tag === 'OL') {
+            return list(node, depth, tag === 'OL');
+        }
+        var inner = children(node, depth);
+        if (/^H[1-6]$/.test(tag)) {
+            return '\n\n' + new Array(+tag.charAt(1) + 1).join('#') + ' ' + tight(inner) + '\n\n';
+        }
+        if (tag === 'BLOCKQUOTE') {
+            return '\n\n' + tight(inner).split('\n').map(function (line) { return '> ' + line; }).join('\n') + '\n\n';
+        }
+        if (tag === 'TR') {
+            var cells = Array.prototype.map.call(node.children, function (cell) {
+                return tight(children(cell, depth)).replace(/\n/g, ' ');
+            });
+            var row = '| ' + cells.join(' | ') + ' |\n';
+            if (node.querySelector('th') && !node.querySelector('td')) {
+                row += '|' + cells.map(function () { return ' --- '; }).join('|') + '|\n';
+            }
+            return row;
+        }
+        if (tag === 'P' || tag === 'TABLE') {
+            return '\n\n' + inner + '\n\n';
+        }
+        if (BLOCK[tag] || tag === 'LI') {
+            return '\n' + inner + '\n';
+        }
+        return inner;
+    }
+
+    var text = walk(root, 0)
+        .split('\n')
+        .map(function (line) { return line.replace(/^ +| +$/g, ''); })
+        .join('\n')
+        .replace(/\n{3,}/g, '\n\n')
+        .replace(/^\s+|\s+$/g, '')
+        .replace(/\u0001/g, ' ');
+    return text.replace(/\u0002(\d+)\u0002/g, function (_, index) { return fences[+index]; });
+}
+"""
+
+# Single round trip: locate the newest assistant message and return it as structured text
+_EXTRACT_LATEST_JS = _LOCATE_LATEST_MESSAGE_JS + _MESSAGE_MARKDOWN_JS + r"""
+var node = aetherlinkLatestMessage();
+return node ? aetherlinkToMarkdown(node) : '';
+"""
+
+_STOP_CONTROL_SELECTORS = [
+    "[aria-label*='stop' i]",
+    "[title*='stop' i]",
+    "[aria-label*='停止']",
+    "[class*='stop-button']",
+    "[class*='stop_button']",
+]
+
+_STREAMING_MESSAGE_SELECTORS = [
+    "[class*='streaming']",
+    "[class*='generating']",
+    "[class*='typing']",
+    "[class*='cursor']",
+]
+
+_MESSAGE_ACTION_SELECTORS = [
+    "[aria-label*='regenerate' i]",
+    "[title*='regenerate' i]",
+    "[aria-label*='copy' i]",
+    "[title*='copy' i]",
+    "[aria-label*='重新生成']",
+    "[aria-label*='复制']",
+    "[class*='regenerate']",
+]
+
+# Clicks the first visible stop control, returns true if there was one
+_CLICK_STOP_JS = r"""
+var selectors = arguments[0];
+for (var i = 0; i < selectors.length; i++) {
+    var nodes;
+    try {
+        nodes = document.querySelectorAll(selectors[i]);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < nodes.length; j++) {
+        if (nodes[j].offsetParent !== null || nodes[j].getClientRects().length > 0) {
+            nodes[j].click();
+            return true;
+        }
+    }
+}
+return false;
+"""
+
+# 'generating' while a stop control or a streaming class is present, 'done' once the
+# newest reply shows its action bar (copy/regenerate), 'unknown' otherwise
+_GENERATION_STATE_JS = _LOCATE_LATEST_MESSAGE_JS + r"""
+var stopSelectors = arguments[0], streamingSelectors = arguments[1], actionSelectors = arguments[2];
+function visible(el) {
+    return el.offsetParent !== null || el.getClientRects().length > 0;
+}
+function any(root, selectors, test) {
+    for (var i = 0; i < selectors.length; i++) {
+        var nodes;
+        try {
+            nodes = root.querySelectorAll(selectors[i]);
+        } catch (e) {
+            continue;
+        }
+        for (var j = 0; j < nodes.length; j++) {
+            if (!test || test(nodes[j])) {
+                return true;
+            }
+        }
+    }
+    return false;
+}
+if (any(document, stopSelectors, visible)) {
+    return 'generating';
+}
+var node = aetherlinkLatestMessage();
+if (!node) {
+    return 'unknown';
+}
+var streaming = any(node, streamingSelectors) || streamingSelectors.some(function (sel) {
+    try { return node.matches(sel); } catch (e) { return false; }
+});
+if (streaming) {
+    return 'generating';
+}
+// Action buttons inside rendered markdown (e.g. a code block's Copy) do not count
+function actionButton(el) {
+    return visible(el) && !el.closest('[class*="markdown"]');
+}
+var scopes = [node];
+if (node.nextElementSibling && (node.nextElementSibling.getAttribute('class') || '').indexOf('ds-message') === -1) {
+    scopes.push(node.nextElementSibling);
+}
+for (var k = 0; k < scopes.length; k++) {
+    if (any(scopes[k], actionSelectors, actionButton)) {
+        return 'done';
+    }
+}
+return 'unknown';
+"""
+
+# Buffers text changes of the newest message in the page as [keep, append] edits
+_OBSERVER_INSTALL_JS = _LOCATE_LATEST_MESSAGE_JS + _MESSAGE_MARKDOWN_JS + """
+var previous = window.__aetherlinkCapture;
+if (previous && previous.observer) {
+    previous.observer.disconnect();
+}
+var state = {node: null, text: '', ops: [], observer: null, scheduled: false};
+function capture() {
+    state.scheduled = false;
+    var node = aetherlinkLatestMessage();
+    if (!node) {
+        return;
+    }
+    var text = aetherlinkToMarkdown(node);
+    if (node !== state.node) {
+        state.node = node;
+        state.text = text;
+        state.ops.push([0, text]);
+        return;
+    }
+    if (text === state.text) {
+        return;
+    }
+    var keep = 0;
+    var max = Math.min(text.length, state.text.length);
+    while (keep < max && text.charCodeAt(keep) === state.text.charCodeAt(keep)) {
+        keep++;
+    }
+    state.ops.push([keep, text.slice(keep)]);
+    state.text = text;
+}
+// Coalesce bursts of mutations into one extraction
+state.observer = new MutationObserver(function () {
+    if (!state.scheduled) {
+        state.scheduled = true;
+        setTimeout(capture, 30);
+    }
+});
+state.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+window.__aetherlinkCapture = state;
+capture();
+return true;
+"""
+
+_OBSERVER_DRAIN_JS = """
+var state = window.__aetherlinkCapture;
+if (!state) {
+    return null;
+}
+var ops = state.ops;
+state.ops = [];
+return ops;
+"""
+
+
+class StreamReset:
+    """
+    Stream event: the text streamed so far is withdrawn (a draft replaced by the answer
+    to a command reprompt, or a page re-render). Discard it; the deltas that follow
+    rebuild the reply from the start.
+    """
+    def __repr__(self):
+        return "STREAM_RESET"
+
+
+# Yielded by send_message_stream and passed to on_delta; compare with `is`
+STREAM_RESET = StreamReset()
+
+
 class AetherLink:
     def __init__(self, headless=False, instructions="You are a helpful AI assistant.",
                  cookie_file='cookies.pkl', user_context_file='user_context.json',
-                 verbose=True, base_url="https://chat.deepseek.com", install_default_commands=True):
+                 verbose=True, base_url="https://chat.deepseek.com", install_default_commands=True,
+                 capture_mode="poll", spa_new_chat=False, continue_conversation=False,
+                 max_conversation_turns=20, max_conversation_chars=60000,
+                 response_timeout=60, max_response_time=600, stability_window=1.2,
+                 network_url_pattern=r"/chat/completion", profile_dir=None, profile_template=None,
+                 lean=False, block_resources=None, block_urls=None, page_load_strategy=None,
+                 background_start=False, load_session=False, metrics=None,
+                 history_budget=1500, history_summarizer=None, history_store=None, conversation_id="default",
+                 context_write_delay=0.5, user_store=None, user_id=None):
         """
         AetherLink wrapper optimized for DeepSeek web automation with enhanced command system.
+
+        capture_mode: "poll" re-reads the page source on every tick, "observer" injects a
+        MutationObserver that buffers text changes in the page and drains them per tick,
+        "network" decodes the completion stream from DevTools Network events (requests
+        matching network_url_pattern) and falls back to the page when none is seen.
+        spa_new_chat: start new conversations inside the already loaded app instead of
+        reloading the page, falling back to a reload when that fails.
+        continue_conversation: keep one DeepSeek conversation going and send the system prompt
+        only on its first turn. It is re-seeded when lost or past max_conversation_turns /
+        max_conversation_chars.
+        response_timeout: give up on a reply after this many seconds without progress;
+        the deadline keeps moving while text grows or the UI shows generation, up to
+        max_response_time. stability_window is only used when the UI state is unknown.
+        profile_dir: run Chrome on this persistent --user-data-dir. The profile keeps the
+        login, so load_session_data has nothing to do unless the profile is new and empty.
+        profile_template: a logged-in profile to clone (copy-on-write where possible) into
+        profile_dir if that does not exist yet, or into a temporary profile that is deleted
+        on close() when no profile_dir is given.
+        lean: load only what the chat needs. Implies the "eager" page_load_strategy,
+        memory-saving Chrome flags, blocking of the block_resources types (default: image,
+        font, media) and of block_urls (default: common analytics hosts). Both lists take
+        effect without lean too; block_urls uses DevTools wildcard patterns ("*.png").
+        background_start: return at once and start Chrome on a background thread. Calls
+        that need the browser wait for it; wait_until_ready() does so explicitly.
+        load_session: also run load_session_data() as part of start-up.
+        metrics: aetherlink.metrics.Metrics receiving per-phase timings of every message
+        (default: the process-wide default_metrics). last_timings holds the latest request's.
+        history_budget: tokens (estimated) of chat history put into the prompt, newest turns
+        first; older turns are folded into a rolling summary. None keeps the last 6 turns.
+        history_summarizer: summarizer(previous_summary, [(role, content), ...]) -> str
+        replacing the default extractive summary (see aetherlink.packing).
+        history_store: where the chat history lives (aetherlink.history; default: in memory).
+        A SQLiteHistory keeps only the newest turns in memory and survives restarts.
+        conversation_id: this instance's conversation in the store; see switch_conversation().
+        context_write_delay: user context changes are written this many seconds after the
+        last one (write-behind, atomic, merged per key under a file lock); close() writes
+        what is pending. None writes every change at once.
+        user_store: per-user contexts (aetherlink.user_store.SQLiteUserStore) instead of the
+        single user_context_file; user_context and the context commands then belong to the
+        active user, see set_active_user(). user_id: the first active user.
         """
+        if capture_mode not in ("poll", "observer", "network"):
+            raise ValueError(f"Unknown capture_mode: {capture_mode}")
+        if block_resources is None:
+            block_resources = _DEFAULT_BLOCKED_RESOURCES if lean else []
+        for kind in block_resources:
+            if kind not in _RESOURCE_EXTENSIONS:
+                raise ValueError(f"Unknown resource type to block: {kind}")
         self.driver = None
-        self.requirements_dir = 'AetherLink_Requirements'
+        self.verbose = verbose
+        if verbose:
+            enable_console_logging()
+        self.requirements_dir = REQUIREMENTS_DIR
         if not os.path.exists(self.requirements_dir):
-            os.makedirs(self.requirements_dir)
-            if verbose:
-                print(f"[AetherLink] Created directory: {self.requirements_dir}")
+            # exist_ok: pooled workers may race to create it
+            os.makedirs(self.requirements_dir, exist_ok=True)
+            self._log(f"Created directory: {self.requirements_dir}")
 
         self.cookie_file = os.path.join(self.requirements_dir, cookie_file)
         self.user_context_file = os.path.join(self.requirements_dir, user_context_file)
+        self._context_writer = WriteBehindJson(self.user_context_file, delay=context_write_delay)
+        self.user_store = user_store
+        self.active_user = None if user_store is None else str(user_id if user_id is not None else "default")
+        self._context_keys = (None, [])
         self.localstorage_file = os.path.join(self.requirements_dir, 'localstorage.pkl')
 
+        self.lean = lean
+        self.page_load_strategy = page_load_strategy or ("eager" if lean else "normal")
+        self.block_resources = list(block_resources)
+        self.block_urls = list(_TRACKER_URL_PATTERNS if block_urls is None and lean else block_urls or [])
+
+        self.profile_dir = profile_dir
+        self._owns_profile = False
+        # Only a cloned or previously used profile holds a login; a new empty one still
+        # needs the pickled session restored
+        self._profile_has_session = bool(profile_dir and os.path.isdir(profile_dir) and os.listdir(profile_dir))
+        if profile_template and (profile_dir is None or not os.path.exists(profile_dir)):
+            clone = clone_profile(profile_template, profile_dir)
+            self.profile_dir = clone['path']
+            self._owns_profile = profile_dir is None
+            self._profile_has_session = True
+            self._log(f"Cloned profile to {clone['path']} "
+                      f"({clone['reflinked']} reflinked, {clone['copied']} copied)")
+
         self.instructions = instructions
         self.user_context = {}
-        self.chat_history = []
+        self.history_store = history_store if history_store is not None else InMemoryHistory()
+        self.conversation_id = conversation_id
+        self.history_packer = HistoryPacker(history_budget, summarizer=history_summarizer) if history_budget else None
         self.headless = headless
-        self.verbose = verbose
         self.base_url = base_url.rstrip('/')
+        self.capture_mode = capture_mode
+        self.network_url_pattern = network_url_pattern
+        self._network_capture = None
+        self._network_armed = False
+        self.spa_new_chat = spa_new_chat
+        self.new_chat_stats = {'spa': 0, 'reload': 0}
+        self.continue_conversation = continue_conversation
+        self.max_conversation_turns = max_conversation_turns
+        self.max_conversation_chars = max_conversation_chars
+        self._conversation = None
+        self._cancel_event = threading.Event()
+        self.response_timeout = response_timeout
+        self.max_response_time = max_response_time
+        self.stability_window = stability_window
+        self.completion_stats = {'ui': 0, 'stability': 0, 'timeout': 0, 'cancelled': 0}
+        self.waiter = ReadinessWaiter(urlparse(self.base_url).netloc or self.base_url)
+        self._input_box_cache = SelectorCache("input box", _INPUT_BOX_SELECTORS)
+        self._send_button_cache = SelectorCache("send button", _SEND_BUTTON_SELECTORS, _SEND_BUTTON_FALLBACK_SELECTORS)
         
+        # System prompt segments, rebuilt only when their input changes
+        self._prompt_versions = {'commands': 0, 'context': 0}
+        self._prompt_segments = {}
+        self._history_lines = {}
+        self.prompt_cache_stats = {'hits': 0, 'rebuilds': 0}
+
         # Initialize custom command registry
         self.command_registry = {}
         if install_default_commands:
@@ -107,8 +714,45 @@ ADDITIONAL SCENARIO RULES:
 -end of core instructions-
 """
 
+        # Held for a whole message, so lifecycle restarts never cut into one
+        self._op_lock = threading.Lock()
+        self.messages_since_start = 0
+        self.messages_sent = 0
+        self.last_used = time.time()
+        self.lifecycle_stats = {'restarts': 0, 'hibernations': 0, 'resurrections': 0}
+        self.metrics = metrics or default_metrics
+        self._timings = {}
+        self.last_timings = {}
+
         self.load_user_context()
-        self.start_browser(headless)
+
+        # Resolved once Chrome is up; the operation lock is held until then
+        self._ready = Future()
+        self._op_lock.acquire()
+        if background_start:
+            threading.Thread(target=self._startup, args=(headless, load_session),
+                             name="aetherlink-start", daemon=True).start()
+        else:
+            self._startup(headless, load_session)
+            self.wait_until_ready()
+
+    def _startup(self, headless, load_session):
+        try:
+            self.start_browser(headless)
+            if load_session:
+                self.load_session_data()
+            self._ready.set_result(True)
+        except BaseException as e:
+            self._ready.set_exception(e)
+        finally:
+            self._op_lock.release()
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the browser has started (see background_start).
+        Raises the start-up error, or concurrent.futures.TimeoutError after `timeout` seconds.
+        """
+        return self._ready.result(timeout)
 
     def _initialize_default_commands(self):
         """Initialize built-in internal commands"""
@@ -135,7 +779,7 @@ ADDITIONAL SCENARIO RULES:
         safe_value = value.replace("_", " ")
         self.user_context[key] = safe_value
         self.user_context["last_updated"] = datetime.now().isoformat()
-        self.save_user_context()
+        self.save_user_context([key, "last_updated"])
         return f"Updated user_context['{key}'] = '{safe_value}'"
 
     def _cmd_get_all_user_context(self, args):
@@ -148,15 +792,31 @@ ADDITIONAL SCENARIO RULES:
             return "Error: get_user_context_by_index requires index"
         try:
             index = int(args[0])
-            items = list(self.user_context.items())
-            if 0 <= index < len(items):
-                key, value = items[index]
+            item = self._user_context_item(index)
+            if item is not None:
+                key, value = item
                 return f"{key}: {value}"
             else:
                 return f"Index {index} out of range"
         except ValueError:
             return "Invalid index"
 
+    def _user_context_item(self, index):
+        """(key, value) at position `index` of user_context, None if out of range"""
+        # The key list is rebuilt only after the context changed (same stamp as the prompt cache)
+        stamp = (self._prompt_versions['context'], id(self.user_context), len(self.user_context))
+        if self._context_keys[0] != stamp:
+            self._context_keys = (stamp, list(self.user_context))
+        keys = self._context_keys[1]
+        if not 0 <= index < len(keys):
+            return None
+        key = keys[index]
+        if key not in self.user_context:
+            # Changed in place without save_user_context()
+            self._context_keys = (None, [])
+            return self._user_context_item(index)
+        return key, self.user_context[key]
+
     def _cmd_get_user_context_by_key(self, args):
         """Handler for get_user_context_by_key command"""
         if not args:
@@ -183,15 +843,15 @@ ADDITIONAL SCENARIO RULES:
             'handler': handler_function,
             'description': description
         }
-        if self.verbose:
-            print(f"✅ Registered command: {command_name} - {description}")
+        self._invalidate_prompt('commands')
+        self._log(f"Registered command: {command_name} - {description}")
 
     def unregister_command(self, command_name):
         """Remove a custom command from the registry"""
         if command_name in self.command_registry:
             del self.command_registry[command_name]
-            if self.verbose:
-                print(f"❌ Unregistered command: {command_name}")
+            self._invalidate_prompt('commands')
+            self._log(f"Unregistered command: {command_name}")
             return True
         return False
 
@@ -219,13 +879,11 @@ ADDITIONAL SCENARIO RULES:
         if command_name in self.command_registry:
             try:
                 result = self.command_registry[command_name]['handler'](args)
-                if self.verbose:
-                    print(f"[COMMAND] Executed: {command_name} -> {result}")
+                self._log(f"Command executed: {command_name} -> {result}")
                 return result
             except Exception as e:
                 error_msg = f"❌ Command '{command_name}' error: {str(e)}"
-                if self.verbose:
-                    print(f"[COMMAND] {error_msg}")
+                self._log(error_msg, logging.WARNING)
                 return error_msg
         return None
 
@@ -304,38 +962,54 @@ ADDITIONAL SCENARIO RULES:
             return f"Error calculating expression: {str(e)}"
 
     # -----------------------
-    # Enhanced system prompt with command documentation
+    # System prompt assembly
     # -----------------------
-    def build_system_prompt(self):
-        prompt_parts = []
-        formatted_instructions = (self.core_instructions.replace('\\n', '\n')) + (self.instructions.replace('\\n', '\n'))
-        prompt_parts.append(f"SYSTEM INSTRUCTIONS: {formatted_instructions}")
-        
-        if self.user_context:
-            context_str = ", ".join([f"{k}: {v}" for k, v in self.user_context.items()])
-            prompt_parts.append(f"USER CONTEXT: {context_str}")
-            
-        if self.chat_history:
-            prompt_parts.append("CHAT HISTORY:")
-            for msg in self.chat_history[-6:]:
-                role = "User" if msg["role"] == "user" else "Assistant"
-                formatted_content = msg['content'].replace('\\n', '\n')
-                filtered_content = self.filter_non_bmp(formatted_content)
-                prompt_parts.append(f"{role}: {filtered_content}")
-                
-        # Enhanced command documentation
-        prompt_parts.extend([
+    def _invalidate_prompt(self, segment):
+        """Mark a cached prompt segment ('commands' or 'context') as stale"""
+        self._prompt_versions[segment] += 1
+
+    def _prompt_segment(self, name, key, build):
+        """Return the cached text of a segment, rebuilding it when `key` changed"""
+        cached = self._prompt_segments.get(name)
+        if cached is not None and cached[0] == key:
+            self.prompt_cache_stats['hits'] += 1
+            return cached[1]
+        text = build()
+        self._prompt_segments[name] = (key, text)
+        self.prompt_cache_stats['rebuilds'] += 1
+        return text
+
+    def _instructions_segment(self):
+        # Keyed on the strings themselves: assigning the attributes directly also works,
+        # and comparing an unchanged string is an identity check
+        core = self._prompt_segment('core', self.core_instructions,
+                                    lambda: self.core_instructions.replace('\\n', '\n'))
+        deployment = self._prompt_segment('deployment', self.instructions,
+                                          lambda: self.instructions.replace('\\n', '\n'))
+        return f"SYSTEM INSTRUCTIONS: {core}{deployment}"
+
+    def _context_segment(self):
+        key = (self._prompt_versions['context'], id(self.user_context), len(self.user_context))
+        return self._prompt_segment('context', key, lambda: "USER CONTEXT: " + ", ".join(
+            [f"{k}: {v}" for k, v in self.user_context.items()]))
+
+    def _commands_segment(self):
+        key = (self._prompt_versions['commands'], len(self.command_registry))
+        return self._prompt_segment('commands', key, self._build_commands_segment)
+
+    def _build_commands_segment(self):
+        prompt_parts = [
             "",
             "CUSTOM COMMANDS (execute these when appropriate, user doesn't see them):",
             "Format: <!command_name arg1 arg2 ...>",
             "",
             "AVAILABLE COMMANDS:"
-        ])
-        
+        ]
+
         # Add all registered commands to the prompt
         for cmd_name, cmd_info in self.command_registry.items():
             prompt_parts.append(f"- <!{cmd_name}> - {cmd_info['description']}")
-            
+
         prompt_parts.extend([
             "",
             "IMPORTANT COMMAND EXECUTION FLOW:",
@@ -348,7 +1022,41 @@ ADDITIONAL SCENARIO RULES:
             "If you write: 'Current price: <!live_price BTC>'",
             "You'll see the result and can then write: 'Current price: $45,123.50 ↑2.34%'",
         ])
-        
+        return "\n".join(prompt_parts)
+
+    def _history_segment(self):
+        if self.history_packer is None:
+            summary, turns = "", tuple((msg["role"], msg["content"]) for msg in self.chat_history[-6:])
+        else:
+            summary, turns = self.history_packer.pack(self.chat_history)
+            turns = tuple(turns)
+        return self._prompt_segment('history', (summary, turns),
+                                    lambda: self._build_history_segment(summary, turns))
+
+    def _build_history_segment(self, summary, turns):
+        # Turns that stay in the window keep their formatted line
+        lines = {}
+        for turn in turns:
+            if turn not in lines:
+                line = self._history_lines.get(turn)
+                if line is None:
+                    role = "User" if turn[0] == "user" else "Assistant"
+                    formatted_content = turn[1].replace('\\n', '\n')
+                    line = f"{role}: {self.filter_non_bmp(formatted_content)}"
+                lines[turn] = line
+        self._history_lines = lines
+        header = ["CHAT HISTORY:"]
+        if summary:
+            header.append(f"Summary of earlier messages:\n{self.filter_non_bmp(summary)}")
+        return "\n".join(header + [lines[turn] for turn in turns])
+
+    def build_system_prompt(self):
+        prompt_parts = [self._instructions_segment()]
+        if self.user_context:
+            prompt_parts.append(self._context_segment())
+        if self.chat_history:
+            prompt_parts.append(self._history_segment())
+        prompt_parts.append(self._commands_segment())
         return "\n".join(prompt_parts)
 
     # -----------------------
@@ -401,7 +1109,7 @@ ADDITIONAL SCENARIO RULES:
                         safe_value = value.replace("_", " ")
                         self.user_context[key] = safe_value
                         self.user_context["last_updated"] = datetime.now().isoformat()
-                        self.save_user_context()
+                        self.save_user_context([key, "last_updated"])
                         return f"Updated user_context['{key}'] = '{safe_value}'"
                 key, value = parts[1], parts[2]
                 if key.startswith('"') and key.endswith('"'):
@@ -411,16 +1119,16 @@ ADDITIONAL SCENARIO RULES:
                 safe_value = value.replace("_", " ")
                 self.user_context[key] = safe_value
                 self.user_context["last_updated"] = datetime.now().isoformat()
-                self.save_user_context()
+                self.save_user_context([key, "last_updated"])
                 return f"Updated user_context['{key}'] = '{safe_value}'"
         elif command.startswith("!get_all_user_context"):
             return str(self.user_context)
         elif command.startswith("!get_user_context_by_index"):
             try:
                 index = int(command.split(" ")[1])
-                items = list(self.user_context.items())
-                if 0 <= index < len(items):
-                    key, value = items[index]
+                item = self._user_context_item(index)
+                if item is not None:
+                    key, value = item
                     return f"{key}: {value}"
                 else:
                     return f"Index {index} out of range"
@@ -440,68 +1148,122 @@ ADDITIONAL SCENARIO RULES:
     # -----------------------
     # Enhanced send_message with command feedback and reprompting
     # -----------------------
-    def send_message(self, message):
+    def send_message(self, message, on_delta=None, cancel_event=None):
         """
         Send a message to DeepSeek and return its text response (cleaned).
         Enhanced with command feedback and reprompting system.
+
+        on_delta: optional callback, called with each visible text delta as it streams in,
+        or with STREAM_RESET when the text streamed so far must be discarded
+        cancel_event: optional threading.Event cancelling this call only (see cancel())
         """
-        try:
-            # Build message + open page
-            self.chat_history.append({"role": "user", "content": message})
-            full_prompt = self.build_system_prompt()
-            self.driver.get(self.base_url)
-            time.sleep(1.2)
+        stream = self._send_locked(message, cancel_event)
+        while True:
+            try:
+                delta = next(stream)
+            except StopIteration as done:
+                return done.value
+            if on_delta:
+                on_delta(delta)
+
+    def send_message_stream(self, message, cancel_event=None):
+        """
+        Generator version of send_message: yields visible text deltas as they arrive,
+        with command tags filtered out. The command/reprompt cycle still runs at the end;
+        the final cleaned response is saved to chat history as usual.
 
-            input_box = self.find_input_box(timeout=12)
+        When streamed text is superseded (a reply that used commands is replaced by the
+        reprompted answer) STREAM_RESET is yielded: drop what was shown so far. The deltas
+        after the last STREAM_RESET always add up to the returned response.
+        """
+        return (yield from self._send_locked(message, cancel_event))
+
+    def _send_locked(self, message, cancel_event=None):
+        """_send_message_iter under the operation lock"""
+        with self._op_lock:
+            # One token per call: cancel() reaches the running call, and a token set while
+            # the call was still waiting for the lock is not wiped when it starts
+            self._cancel_event = cancel_event if cancel_event is not None else threading.Event()
+            if self._cancel_event.is_set():
+                return ""
+            self.last_used = time.time()
+            self._timings = {}
+            started = time.perf_counter()
             try:
-                input_box.clear()
-            except Exception:
-                pass
+                return (yield from self._send_message_iter(message))
+            finally:
+                self.messages_since_start += 1
+                self.messages_sent += 1
+                self.last_used = time.time()
+                self._add_timing('total', time.perf_counter() - started)
+                self.last_timings = self._timings
+                self.metrics.record(self._timings)
 
-            full_message = full_prompt + f"\n\nUser: {message}\nAssistant:"
-            self.type_with_loading_animation(input_box, full_message, "Generating...")
+    # -----------------------
+    # Phase timings (see aetherlink.metrics)
+    # -----------------------
+    def _add_timing(self, phase, seconds):
+        self._timings[phase] = self._timings.get(phase, 0.0) + seconds
+        self.metrics.emit(phase, seconds)
 
-            # Send the message
-            input_box.send_keys("\n")
-            time.sleep(0.5)
-
-            # Try send buttons as fallback
-            send_selectors = [
-                "button[type='submit']",
-                "button[data-testid*='send']",
-                "button[class*='send']",
-                "button[aria-label*='send']",
-                "button[aria-label*='Send']",
-                "button[class*='ds-icon-button']",
-                "button[class='_7436101 bcc55ca1 ds-icon-button ds-icon-button--l ds-icon-button--sizing-container ds-icon-button--disabled']",
-                "button:last-child"
-            ]
-
-            send_btn = None
-            for sel in send_selectors:
+    @contextmanager
+    def _timed(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_timing(phase, time.perf_counter() - started)
+
+    @contextmanager
+    def _timed_stream(self, phase, streamed):
+        """_timed for a streaming phase: time the consumer held the stream is not counted"""
+        started = time.perf_counter()
+        suspended = streamed['suspended']
+        try:
+            yield
+        finally:
+            self._add_timing(phase, time.perf_counter() - started - (streamed['suspended'] - suspended))
+
+    def _send_message_iter(self, message):
+        """Generator behind send_message: yields visible deltas, returns the cleaned response"""
+        # suspended: seconds spent parked at a yield, i.e. in the caller, kept out of the timings
+        streamed = {'sent': '', 'open': True, 'suspended': 0.0}
+        try:
+            # A hibernated browser that fails to come back is reported like any other error
+            self._ensure_browser()
+
+            # Build message + open page
+            self.chat_history.append({"role": "user", "content": message})
+            with self._timed('navigation'):
+                full_message = self._prepare_conversation(message)
+
+            # find_input_box returns as soon as the page is interactive
+            with self._timed('find_input_box'):
+                input_box = self.find_input_box(timeout=12)
+            with self._timed('text_injection'):
                 try:
-                    send_btn = WebDriverWait(self.driver, 2).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, sel))
-                    )
-                    if send_btn and send_btn.is_displayed():
-                        send_btn.click()
-                        break
+                    input_box.clear()
                 except Exception:
-                    send_btn = None
+                    pass
+                self.type_with_loading_animation(input_box, full_message, "Generating...")
 
-            if not send_btn:
-                print("Warning: Send button not found. Relying on Enter.")
+            with self._timed('send'):
+                submitted = self._submit_prompt(input_box)
+            if not submitted:
+                logger.warning("Send button not found. Relying on Enter.")
 
             # Stream the initial reply
-            raw_response = self.stream_response()
-            clean_response, commands = self.extract_commands_from_response(raw_response)
+            raw_response = yield from self._stream_visible(streamed)
+            if self._cancel_event.is_set():
+                return (yield from self._cancelled_turn(message, streamed, raw_response))
+            with self._timed('command_execution'):
+                clean_response, commands = self.extract_commands_from_response(raw_response)
 
             # ENHANCED: If commands were executed, reprompt the AI with results
             if commands:
-                if self.verbose:
-                    print(f"[SYSTEM] Commands executed: {len(commands)}")
-                    for cmd_result in commands:
-                        print(f"[COMMAND RESULT] {cmd_result}")
+                self._log(f"Commands executed: {len(commands)}")
+                for cmd_result in commands:
+                    self._log(f"Command result: {cmd_result}")
 
                 # Build enhanced prompt with command results
                 command_results = "\n".join([f"Command Result: {cmd}" for cmd in commands])
@@ -517,50 +1279,49 @@ ADDITIONAL SCENARIO RULES:
                 )
 
                 # Clear and resend with enhanced prompt
-                input_box = self.find_input_box(timeout=12)
-                try:
-                    input_box.clear()
-                except Exception:
-                    pass
-
-                self.type_with_loading_animation(
-                    input_box, enhanced_prompt,
-                    "Processing command results..."
-                )
+                with self._timed('reprompt'):
+                    input_box = self.find_input_box(timeout=12)
+                    try:
+                        input_box.clear()
+                    except Exception:
+                        pass
 
-                # Send the reprompt
-                try:
-                    input_box.send_keys("\n")
-                except:
-                    pass
+                    self.type_with_loading_animation(
+                        input_box, enhanced_prompt,
+                        "Processing command results..."
+                    )
 
-                send_btn = None
-                for sel in send_selectors:
-                    try:
-                        send_btn = WebDriverWait(self.driver, 2).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, sel))
-                        )
-                        if send_btn and send_btn.is_displayed():
-                            send_btn.click()
-                            break
-                    except:
-                        send_btn = None
+                    # Send the reprompt
+                    self._submit_prompt(input_box)
+                self._track_conversation(enhanced_prompt)
 
                 # Stream the final response
-                final_raw_response = self.stream_response()
-                final_clean_response, final_commands = self.extract_commands_from_response(final_raw_response)
+                streamed['open'] = True
+                streamed['reprompt'] = True
+                with self._timed_stream('final_stream', streamed):
+                    final_raw_response = yield from self._stream_visible(streamed)
+                if self._cancel_event.is_set():
+                    return (yield from self._cancelled_turn(message, streamed, final_raw_response))
+                with self._timed('command_execution'):
+                    final_clean_response, final_commands = self.extract_commands_from_response(final_raw_response)
                 
                 # Use the final response as the result
                 clean_response = final_clean_response
                 
-                if self.verbose and final_commands:
-                    print(f"[SYSTEM] Additional commands in final response: {len(final_commands)}")
+                if final_commands:
+                    self._log(f"Additional commands in final response: {len(final_commands)}")
+
+            # Make sure stream consumers end up with exactly the cleaned reply
+            yield from self._visible_deltas(streamed, clean_response, final=True)
 
             # Save to chat history and return
             self.chat_history.append({"role": "assistant", "content": clean_response})
+            self._track_conversation(clean_response, turn_done=True)
             return clean_response
 
         except Exception as e:
+            # The conversation may be half-written, start a new one next time
+            self._conversation = None
             # captcha handling block
             estr = str(e).lower()
             if self.headless and any(k in estr for k in ("captcha", "auth", "cookie")):
@@ -573,36 +1334,315 @@ ADDITIONAL SCENARIO RULES:
                 self.driver.get(self.base_url)
                 input("Complete login and press Enter...")
                 self.save_session_data()
-                return self.send_message(message)
+                return (yield from self._send_message_iter(message))
 
             error_msg = f"Error: {str(e)}"
-            if self.verbose:
-                print(error_msg)
+            self._log(error_msg, logging.ERROR)
             return error_msg
 
+    def _cancelled_turn(self, message, streamed, raw_response):
+        """
+        Hand back what a cancelled send has so far, without running commands. The
+        partial reply is not saved and the unanswered user turn is taken back out of
+        chat_history, so the next prompt's history never holds a turn without its reply.
+        """
+        self._conversation = None
+        history = self.chat_history
+        if history and history[-1] == {"role": "user", "content": message}:
+            history.pop()
+        partial = self._visible_stream_text(raw_response).strip()
+        yield from self._visible_deltas(streamed, partial, final=True)
+        return partial
+
+    # -----------------------
+    # Streaming deltas
+    # -----------------------
+    def _visible_stream_text(self, text):
+        """Reply text as the user may see it mid-stream: complete command tags removed, partial ones held back"""
+        visible = re.sub(r'<(![^>]+)>', '', text)
+        # Hold back a command that has started but not closed yet
+        pending = visible.rfind('<!')
+        if pending != -1:
+            visible = visible[:pending]
+        elif visible.endswith('<'):
+            visible = visible[:-1]
+        return visible
+
+    def _visible_deltas(self, streamed, visible, final=False):
+        """
+        Stream events that take the consumer from what it has seen to `visible`:
+        the new tail, or STREAM_RESET plus the whole text when it was rewritten.
+        Mid-stream, text that only shrank is held until it grows again; `final`
+        makes the consumer's text equal `visible` exactly.
+        """
+        sent = streamed['sent']
+        if visible.startswith(sent):
+            streamed['sent'] = visible
+            return [visible[len(sent):]] if len(visible) > len(sent) else []
+        if not final and sent.startswith(visible):
+            return []
+        streamed['sent'] = visible
+        return [STREAM_RESET, visible] if visible else [STREAM_RESET]
+
+    def _stream_visible(self, streamed):
+        """Run the response stream, yielding visible deltas; returns the raw reply text"""
+        responses = self._iter_response()
+        started = time.perf_counter()
+        suspended = streamed['suspended']
+        first_text = None
+        while True:
+            try:
+                text = next(responses)
+            except StopIteration as done:
+                if not streamed.get('reprompt'):
+                    # The reprompted stream is timed as a whole (final_stream)
+                    self._add_timing('generation', time.perf_counter() - (first_text or started)
+                                     - (streamed['suspended'] - suspended))
+                return done.value
+            if first_text is None and text.strip():
+                first_text = time.perf_counter()
+                if not streamed.get('reprompt'):
+                    self._add_timing('time_to_first_token', first_text - started - (streamed['suspended'] - suspended))
+                # generation starts counting here
+                suspended = streamed['suspended']
+            if not streamed['open']:
+                continue
+            if not streamed.get('reprompt') and '<!' in text:
+                # The draft used a command: what follows is superseded by the reprompted answer
+                streamed['open'] = False
+                text = text[:text.index('<!')]
+            paused = time.perf_counter()
+            yield from self._visible_deltas(streamed, self._visible_stream_text(text).strip())
+            streamed['suspended'] += time.perf_counter() - paused
+
+    # -----------------------
+    # Continued conversations (delta prompting)
+    # -----------------------
+    def _conversation_snapshot(self):
+        return {
+            'instructions': (self.core_instructions, self.instructions),
+            'commands': self._commands_segment(),
+            'context': dict(self.user_context),
+        }
+
+    def _conversation_alive(self):
+        """True if the browser still shows the conversation this instance is continuing"""
+        if not self._conversation or not self._conversation.get('url'):
+            return False
+        try:
+            return (self.driver.current_url == self._conversation['url']
+                    and self.driver.execute_script(
+                        "return document.querySelectorAll('[class*=\"ds-message\"]').length") > 0)
+        except Exception:
+            return False
+
+    def _prepare_conversation(self, message):
+        """
+        Make the browser ready for `message` and return the text to type.
+        In continue_conversation mode later turns only carry the message and changed context.
+        """
+        if self.continue_conversation and self._conversation_alive():
+            conversation = self._conversation
+            snapshot = self._conversation_snapshot()
+            if (conversation['turns'] < self.max_conversation_turns
+                    and conversation['chars'] < self.max_conversation_chars
+                    and snapshot['instructions'] == conversation['snapshot']['instructions']
+                    and snapshot['commands'] == conversation['snapshot']['commands']):
+                delta = []
+                if snapshot['context'] != conversation['snapshot']['context']:
+                    context_str = ", ".join([f"{k}: {v}" for k, v in snapshot['context'].items()])
+                    delta.append(f"UPDATED USER CONTEXT: {context_str}\n")
+                    conversation['snapshot']['context'] = snapshot['context']
+                delta.append(f"User: {message}\nAssistant:")
+                self._track_conversation("".join(delta))
+                return "".join(delta)
+            self._log("Re-seeding conversation (instructions/commands changed or conversation too long).")
+        elif self._conversation:
+            self._log("Conversation lost, re-seeding with the full system prompt.")
+
+        full_prompt = self.build_system_prompt()
+        self._open_new_chat()
+        full_message = full_prompt + f"\n\nUser: {message}\nAssistant:"
+        if self.continue_conversation:
+            self._conversation = {
+                'url': None,
+                'turns': 0,
+                'chars': 0,
+                'snapshot': self._conversation_snapshot(),
+            }
+            self._track_conversation(full_message)
+        return full_message
+
+    def _track_conversation(self, text, turn_done=False):
+        """Account text added to the continued conversation"""
+        if not self._conversation:
+            return
+        self._conversation['chars'] += len(text)
+        if turn_done:
+            self._conversation['turns'] += 1
+            try:
+                # DeepSeek gives the chat its own URL once the first reply exists
+                self._conversation['url'] = self.driver.current_url
+            except Exception:
+                self._conversation = None
+
+    # -----------------------
+    # Readiness waits (no fixed sleeps)
+    # -----------------------
+    def _wait_page_ready(self, timeout=5):
+        """Wait until the document has finished loading (parsed is enough with the eager strategy)"""
+        ready_states = ("interactive", "complete") if self.page_load_strategy == "eager" else ("complete",)
+        return self.waiter.wait(
+            "page_ready",
+            lambda: self.driver.execute_script("return document.readyState") in ready_states,
+            timeout
+        )
+
+    def _open_new_chat(self):
+        """
+        Open an empty conversation. With spa_new_chat the loaded app is asked for a new
+        chat (control or client-side route); a full page load is the fallback.
+        Returns True if the page was not reloaded.
+        """
+        if self.spa_new_chat:
+            try:
+                if self.driver.current_url.startswith(self.base_url):
+                    how = self.driver.execute_script(_SPA_NEW_CHAT_JS)
+                    if how and self.waiter.wait(
+                        "spa_new_chat",
+                        lambda: self.driver.execute_script(_CHAT_EMPTY_JS),
+                        3
+                    ):
+                        self.new_chat_stats['spa'] += 1
+                        return True
+                    self._log("In-app new chat did not clear the conversation, reloading.")
+            except Exception as e:
+                self._log(f"In-app new chat failed, reloading: {e}")
+
+        self.driver.get(self.base_url)
+        self.new_chat_stats['reload'] += 1
+        return False
+
+    def _wait_send_button_enabled(self, timeout=2):
+        """
+        Wait until the UI has registered the typed prompt and enabled the send button.
+        Only send-specific selectors count; without such a button this returns at once.
+        """
+        return self.waiter.wait(
+            "send_button_enabled",
+            lambda: self.driver.execute_script(_SEND_BUTTON_ENABLED_JS, _SEND_BUTTON_SELECTORS),
+            timeout
+        )
+
+    def _click_send_button(self, timeout=2):
+        """Click the send button found through the selector cache, returns True if clicked"""
+        for _ in range(2):
+            try:
+                send_btn = self.waiter.wait(
+                    "send_button",
+                    lambda: self._send_button_cache.resolve(self.driver),
+                    timeout,
+                    ignored_exceptions=()
+                )
+            except Exception as e:
+                self._log(f"Send button lookup script failed, searching selector by selector: {e}")
+                return self._click_send_button_by_selectors()
+            if not send_btn:
+                return False
+            try:
+                send_btn.click()
+                return True
+            except Exception:
+                # Went stale between lookup and click, look it up once more
+                self._send_button_cache.invalidate()
+        return False
+
+    def _click_send_button_by_selectors(self):
+        """Slow path: wait on every send selector with WebDriverWait"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        for sel in _SEND_BUTTON_SELECTORS + _SEND_BUTTON_FALLBACK_SELECTORS:
+            try:
+                send_btn = WebDriverWait(self.driver, 2).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, sel))
+                )
+                if send_btn and send_btn.is_displayed():
+                    send_btn.click()
+                    return True
+            except Exception:
+                pass
+        return False
+
+    def _submit_prompt(self, input_box, started_timeout=3):
+        """
+        Press Enter and wait for generation to start, clicking a send button only
+        if Enter did not submit. Returns False if the prompt could not be confirmed sent.
+        """
+        self._wait_send_button_enabled()
+        try:
+            before, prompt_length = self.driver.execute_script(_SEND_BASELINE_JS)
+        except Exception:
+            before, prompt_length = 0, 0
+
+        self._arm_network_capture()
+        try:
+            input_box.send_keys("\n")
+        except Exception:
+            pass
+
+        def generation_started():
+            return self.driver.execute_script(_GENERATION_STARTED_JS, before, prompt_length > 0)
+
+        if self.waiter.wait("generation_started", generation_started, started_timeout):
+            return True
+
+        # Enter did not submit, try send buttons as fallback
+        return self._click_send_button()
+
+    def cancel(self):
+        """
+        Ask the message currently being sent (from another thread) to stop: generation is
+        stopped on the page and the call returns what it has so far. Neither the message nor
+        the partial reply stays in chat_history. To cancel one specific
+        call, even before it starts, pass it a cancel_event and set that instead.
+        """
+        self._cancel_event.set()
+
+    def _stop_generation(self):
+        """Click the page's stop control so DeepSeek does not keep generating, returns True if clicked"""
+        try:
+            return bool(self.driver.execute_script(_CLICK_STOP_JS, _STOP_CONTROL_SELECTORS))
+        except Exception:
+            return False
+
+    def get_wait_timings(self):
+        """Learned readiness timings for this host"""
+        return self.waiter.get_timings()
+
+    def get_selector_stats(self):
+        """Which selectors were learned for the input box and send button, with cache hit counts"""
+        return {
+            cache.name: dict(cache.stats, learned=cache.learned)
+            for cache in (self._input_box_cache, self._send_button_cache)
+        }
+
     # -----------------------
     # ALL ORIGINAL AETHERLINK METHODS PRESERVED
     # -----------------------
 
     # Utility / logging
-    def _log(self, message):
-        if self.verbose:
-            print(f"[AetherLink] {message}")
+    def _log(self, message, level=logging.INFO):
+        # Quiet instances still log, at debug level
+        logger.log(level if self.verbose else logging.DEBUG, message)
 
     def loading_animation(self, message, duration=3):
+        """Show a spinner for `duration` seconds (verbose only; returns at once otherwise)"""
         if not self.verbose:
-            time.sleep(duration)
             return
-        animation = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
-        start_time = time.time()
-        i = 0
-        while time.time() - start_time < duration:
-            sys.stdout.write(f"\r{message} {animation[i % len(animation)]}")
-            sys.stdout.flush()
-            time.sleep(0.09)
-            i += 1
-        sys.stdout.write(f"\r{message} [COMPLETE]\n")
-        sys.stdout.flush()
+        with progress.task(message):
+            time.sleep(duration)
 
     def _extract_ordered_text(self, element):
             """Extract text in proper order from an element"""
@@ -636,7 +1676,25 @@ ADDITIONAL SCENARIO RULES:
         return ""
 
     def get_latest_response_text(self):
-        """Get the latest DeepSeek response text using BeautifulSoup with better text handling"""
+        """Get the latest DeepSeek response text: one in-page script call, BeautifulSoup as fallback"""
+        text = self._extract_latest_via_js()
+        if text is not None:
+            return text
+        return self._extract_latest_via_soup()
+
+    def _extract_latest_via_js(self):
+        """Extract only the newest assistant message in the page, keeping its markdown structure"""
+        try:
+            text = self.driver.execute_script(_EXTRACT_LATEST_JS)
+        except Exception as e:
+            self._log(f"In-page extraction failed, using BeautifulSoup: {e}")
+            return None
+        return text if isinstance(text, str) else None
+
+    def _extract_latest_via_soup(self):
+        """Serialise the whole page and extract the latest message with BeautifulSoup"""
+        from bs4 import BeautifulSoup
+
         try:
             page_source = self.driver.page_source
             soup = BeautifulSoup(page_source, 'html.parser')
@@ -662,40 +1720,47 @@ ADDITIONAL SCENARIO RULES:
             
             if messages:
                 latest_message = messages[-1]
+                if latest_message.has_attr('data-aetherlink-answered'):
+                    # Still the previous reply, the new one has not appeared yet
+                    return ""
+                if (soup.html is not None and soup.html.has_attr('data-aetherlink-sent')
+                        and not self._is_markdown_message(latest_message)):
+                    # The prompt just sent, its reply has not started yet
+                    return ""
                 return self._extract_ordered_text(latest_message)
             
             return self._fallback_text_extraction(soup)
             
         except Exception as e:
-            print(f"Error: {e}")
+            logger.warning(f"Page extraction failed: {e}")
             return ""
 
+    @staticmethod
+    def _is_markdown_message(node):
+        """True if a soup message node is (or holds) a rendered reply"""
+        return ('markdown' in " ".join(node.get('class') or [])
+                or node.find(class_=lambda x: x and 'markdown' in x) is not None)
+
     def quick_loading(self, message):
+        """Show a spinner until reply text appears, for at most ~1.2s (verbose only)"""
         if not self.verbose:
-            time.sleep(1.5)
             return
-        animation = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
-        for i in range(15):
-            sys.stdout.write(f"\r{message} {animation[i % len(animation)]}")
-            sys.stdout.flush()
-            time.sleep(0.08)
-            try:
-                current_text = self.get_latest_response_text()
-                if current_text.strip():
-                    sys.stdout.write(f"\r{message} \n")
-                    sys.stdout.flush()
-                    return
-            except Exception:
-                pass
-        sys.stdout.write(f"\r{message} [LOADING]\n")
-        sys.stdout.flush()
+        with progress.task(message) as task:
+            for _ in range(15):
+                try:
+                    if self.get_latest_response_text().strip():
+                        return
+                except Exception:
+                    pass
+                time.sleep(0.08)
+            task.done("[LOADING]")
 
     # Browser lifecycle
     def start_browser(self, headless):
         """Start browser with sane options and anti-detection measures"""
-        if self.verbose:
-            self.loading_animation("Starting browser", 1.2)
+        from selenium import webdriver
 
+        self._log("Starting browser...")
         options = webdriver.ChromeOptions()
         if headless:
             try:
@@ -707,6 +1772,18 @@ ADDITIONAL SCENARIO RULES:
         options.add_experimental_option('useAutomationExtension', False)
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
+        if self.profile_dir:
+            options.add_argument(f'--user-data-dir={os.path.abspath(self.profile_dir)}')
+        options.page_load_strategy = self.page_load_strategy
+        if self.lean:
+            for arg in _LEAN_CHROME_ARGS:
+                options.add_argument(arg)
+        if 'image' in self.block_resources:
+            # Also skips decoding images that are inlined or already cached
+            options.add_argument('--blink-settings=imagesEnabled=false')
+        if self.capture_mode == "network":
+            # Network events (with response data) arrive through the performance log
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
         try:
             self.driver = webdriver.Chrome(options=options)
@@ -718,6 +1795,34 @@ ADDITIONAL SCENARIO RULES:
             self._log("Chrome started.")
         except Exception as e:
             raise RuntimeError(f"Failed to start Chrome driver: {e}")
+        self._apply_request_blocking()
+
+    def _blocked_url_patterns(self):
+        patterns = list(self.block_urls)
+        for kind in self.block_resources:
+            for ext in _RESOURCE_EXTENSIONS[kind]:
+                patterns += [f"*.{ext}", f"*.{ext}?*"]
+        return patterns
+
+    def _apply_request_blocking(self):
+        """Have Chrome refuse the configured URL patterns before they hit the network"""
+        patterns = self._blocked_url_patterns()
+        if not patterns:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            self._log(f"Blocking {len(patterns)} URL patterns.")
+        except Exception as e:
+            self._log(f"Request blocking unavailable: {e}")
+
+    def get_memory_usage(self):
+        """Resident memory of this browser's process tree: {'rss_bytes', 'processes'} or None"""
+        try:
+            pid = self.driver.service.process.pid
+        except Exception:
+            return None
+        return tree_rss(pid)
 
     def is_browser_alive(self):
         try:
@@ -726,13 +1831,88 @@ ADDITIONAL SCENARIO RULES:
             return False
 
     def close(self):
+        # A background start still running would leave its Chrome behind
+        self._ready.exception()
+        self._context_writer.close()
         if self.driver:
             try:
                 self.driver.quit()
             except Exception:
                 pass
-            if self.verbose:
-                print("\nBrowser closed. Goodbye!")
+            self._log("Browser closed.")
+        if self._owns_profile:
+            # Temporary clone of profile_template
+            remove_profile(self.profile_dir)
+            self._owns_profile = False
+
+    # -----------------------
+    # Browser lifecycle (see aetherlink.lifecycle)
+    # -----------------------
+    @property
+    def hibernated(self):
+        return self.driver is None and self._ready.done()
+
+    def _ensure_browser(self):
+        """Start Chrome again (with the saved session) if it was hibernated, returns True if it did"""
+        if self.driver is not None:
+            return False
+        self.start_browser(self.headless)
+        self.load_session_data()
+        self.lifecycle_stats['resurrections'] += 1
+        self._log("Browser resumed from hibernation.")
+        return True
+
+    def _shutdown_browser(self):
+        """Save the session and quit Chrome, keeping everything needed to start it again"""
+        if self.driver is None:
+            return
+        if not self.profile_dir:
+            self.save_session_data()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+        self.messages_since_start = 0
+        self._network_capture = None
+        self._network_armed = False
+        self._input_box_cache.invalidate()
+        self._send_button_cache.invalidate()
+
+    def hibernate(self, blocking=True):
+        """
+        Quit Chrome to free its memory. The next message (or is_logged_in /
+        load_session_data) starts it again with the saved session.
+        Returns False if nothing was done (already hibernated, or busy and not `blocking`).
+        """
+        if not self._op_lock.acquire(blocking):
+            return False
+        try:
+            if self.driver is None:
+                return False
+            self._shutdown_browser()
+            self.lifecycle_stats['hibernations'] += 1
+            self._log("Browser hibernated.")
+            return True
+        finally:
+            self._op_lock.release()
+
+    def recycle(self, blocking=True):
+        """
+        Restart Chrome with the saved session, dropping whatever memory it has leaked.
+        Returns False if busy and not `blocking`.
+        """
+        if not self._op_lock.acquire(blocking):
+            return False
+        try:
+            self._shutdown_browser()
+            self.start_browser(self.headless)
+            self.load_session_data()
+            self.lifecycle_stats['restarts'] += 1
+            self._log("Browser recycled.")
+            return True
+        finally:
+            self._op_lock.release()
 
     # Cookie and localstorage persistence
     def save_session_data(self):
@@ -740,8 +1920,8 @@ ADDITIONAL SCENARIO RULES:
         if not self.driver:
             return
         try:
-            with open(self.cookie_file, 'wb') as file:
-                pickle.dump(self.driver.get_cookies(), file)
+            # Other instances may be reading these files: replace them, never rewrite in place
+            write_pickle_atomic(self.cookie_file, self.driver.get_cookies())
             
             localstorage_data = {}
             try:
@@ -757,8 +1937,7 @@ ADDITIONAL SCENARIO RULES:
             except Exception as e:
                 self._log(f"Failed to read localstorage: {e}")
             
-            with open(self.localstorage_file, 'wb') as file:
-                pickle.dump(localstorage_data, file)
+            write_pickle_atomic(self.localstorage_file, localstorage_data)
                 
             if self.verbose:
                 self._log(f"Saved session data (cookies + localstorage)")
@@ -767,100 +1946,169 @@ ADDITIONAL SCENARIO RULES:
             if self.verbose:
                 self._log(f"Failed to save session data: {e}")
 
-    def load_session_data(self):
-        """Load both cookies and localstorage"""
-        if not self.driver:
-            return False
-            
-        loaded = False
-        
+    def _read_session_files(self):
+        """Saved cookies and localstorage, (None, None) for whatever is missing"""
+        cookies = localstorage_data = None
         if os.path.exists(self.cookie_file):
             try:
-                if self.verbose:
-                    self.loading_animation("Loading cookies", 0.6)
-                    
-                self.driver.get(self.base_url)
-                time.sleep(1)
-                
                 with open(self.cookie_file, 'rb') as file:
                     cookies = pickle.load(file)
-                    
-                for cookie in cookies:
-                    cookie = {k: v for k, v in cookie.items() if k not in ('sameSite',)}
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except Exception:
-                        pass
-                        
-                loaded = True
             except Exception as e:
-                if self.verbose:
-                    self._log(f"Failed to load cookies: {e}")
-
+                self._log(f"Failed to read cookies: {e}")
         if os.path.exists(self.localstorage_file):
             try:
-                if self.verbose:
-                    self.loading_animation("Loading localstorage", 0.6)
-                    
-                self.driver.get(self.base_url)
-                time.sleep(1)
-                
                 with open(self.localstorage_file, 'rb') as file:
                     localstorage_data = pickle.load(file)
-                    
-                for key, value in localstorage_data.items():
-                    try:
-                        self.driver.execute_script(f"localStorage.setItem('{key}', '{value}');")
-                    except Exception:
-                        pass
-                        
-                loaded = True
             except Exception as e:
-                if self.verbose:
-                    self._log(f"Failed to load localstorage: {e}")
+                self._log(f"Failed to read localstorage: {e}")
+        return cookies, localstorage_data
 
-        if loaded:
-            self.driver.refresh()
-            time.sleep(1)
-            if self.verbose:
-                self._log("Session data loaded (best-effort).")
-                
-        return loaded
+    def _cdp_cookie(self, cookie):
+        """Convert a Selenium cookie dict to a CDP Network.CookieParam"""
+        param = {'name': cookie['name'], 'value': cookie['value'], 'path': cookie.get('path', '/')}
+        if cookie.get('domain'):
+            param['domain'] = cookie['domain']
+        else:
+            param['url'] = self.base_url
+        for key, cdp_key in (('secure', 'secure'), ('httpOnly', 'httpOnly'), ('expiry', 'expires')):
+            if key in cookie:
+                param[cdp_key] = cookie[key]
+        same_site = _CDP_SAME_SITE.get(str(cookie.get('sameSite', '')).lower())
+        if same_site:
+            param['sameSite'] = same_site
+        return param
+
+    def _restore_session_cdp(self, cookies, localstorage_data):
+        """
+        Restore with DevTools before the first navigation: all cookies in one
+        Network.setCookies call, localstorage from a script that runs before the
+        page's own scripts. Needs a single page load.
+        """
+        script_id = None
+        if cookies:
+            self.driver.execute_cdp_cmd('Network.setCookies', {
+                'cookies': [self._cdp_cookie(cookie) for cookie in cookies]
+            })
+        if localstorage_data:
+            origin = "{0.scheme}://{0.netloc}".format(urlparse(self.base_url))
+            source = _RESTORE_LOCALSTORAGE_JS % (json.dumps(origin), json.dumps(localstorage_data))
+            script_id = self.driver.execute_cdp_cmd(
+                'Page.addScriptToEvaluateOnNewDocument', {'source': source}
+            ).get('identifier')
+        try:
+            self.driver.get(self.base_url)
+            self._wait_page_ready()
+        finally:
+            if script_id is not None:
+                try:
+                    self.driver.execute_cdp_cmd('Page.removeScriptToEvaluateOnNewDocument', {'identifier': script_id})
+                except Exception:
+                    pass
 
-    def load_user_context(self):
-        if os.path.exists(self.user_context_file):
+    def _restore_session_webdriver(self, cookies, localstorage_data):
+        """Plain WebDriver restore (no DevTools): load, set everything, reload once"""
+        self.driver.get(self.base_url)
+        self._wait_page_ready()
+        for cookie in cookies or []:
+            cookie = {k: v for k, v in cookie.items() if k not in ('sameSite',)}
             try:
-                with open(self.user_context_file, 'r', encoding='utf-8') as f:
-                    self.user_context = json.load(f)
+                self.driver.add_cookie(cookie)
             except Exception:
-                self.user_context = {}
+                pass
+        if localstorage_data:
+            try:
+                self.driver.execute_script(_SET_LOCALSTORAGE_JS, localstorage_data)
+            except Exception as e:
+                self._log(f"Failed to load localstorage: {e}")
+        self.driver.refresh()
+        self._wait_page_ready()
+
+    def load_session_data(self):
+        """Load both cookies and localstorage"""
+        if not self.driver:
+            # Still starting (waits for it) or hibernated (starting again restores the session)
+            with self._op_lock:
+                if self._ensure_browser():
+                    return True
+        if self.profile_dir and self._profile_has_session:
+            # The Chrome profile already holds the session
+            return True
 
-    def save_user_context(self):
+        cookies, localstorage_data = self._read_session_files()
+        if cookies is None and localstorage_data is None:
+            return False
+
+        started = time.time()
         try:
-            with open(self.user_context_file, 'w', encoding='utf-8') as f:
-                json.dump(self.user_context, f, indent=2, ensure_ascii=False)
-            if self.verbose:
-                self._log("User context saved.")
+            if not hasattr(self.driver, 'execute_cdp_cmd'):
+                raise RuntimeError("driver has no DevTools access")
+            self._restore_session_cdp(cookies, localstorage_data)
+            how = "DevTools"
         except Exception as e:
-            if self.verbose:
-                self._log(f"Failed to save user context: {e}")
+            self._log(f"DevTools session restore failed, using WebDriver: {e}")
+            try:
+                self._restore_session_webdriver(cookies, localstorage_data)
+                how = "WebDriver"
+            except Exception as e:
+                self._log(f"Failed to load session data: {e}")
+                return False
+
+        self._log(f"Session data loaded via {how} in {time.time() - started:.2f}s (best-effort).")
+        return True
+
+    def load_user_context(self):
+        self._invalidate_prompt('context')
+        if self.user_store is not None:
+            self.user_context = self.user_store.get(self.active_user)
+            return
+        # Pending changes first, or the file would not have them yet
+        self._context_writer.flush()
+        self.user_context = read_json(self.user_context_file)
+
+    def save_user_context(self, keys=None):
+        """
+        Queue user context changes for writing (see context_write_delay).
+        keys: the keys that changed (default: all of them); missing ones are deleted.
+        """
+        # Every context write ends here, so this is where the prompt segment goes stale
+        self._invalidate_prompt('context')
+        if self.user_store is not None:
+            self.user_store.save(self.active_user, self.user_context, keys)
+            return
+        self._context_writer.save(self.user_context, keys)
+
+    def set_active_user(self, user_id):
+        """
+        Make `user_id` the user whose context is used (requires user_store).
+        The next message starts a new chat so contexts of different users never mix.
+        """
+        if self.user_store is None:
+            raise ValueError("set_active_user requires a user_store")
+        user_id = str(user_id)
+        with self._op_lock:
+            if user_id == self.active_user:
+                return False
+            self.active_user = user_id
+            self.load_user_context()
+            self._conversation = None
+        return True
+
+    def flush_user_context(self):
+        """Write pending user context changes now, returns False if that failed"""
+        return self._context_writer.flush()
 
     # DOM helpers / selectors
     def find_input_box(self, timeout=12):
         """
         DeepSeek-specific input box detection using placeholder text.
         Obfuscation-resistant - uses the consistent 'Message DeepSeek' text.
+        The element is cached until it goes stale and the winning selector is tried first.
         """
-        selectors = [
-            "textarea[placeholder*='Message DeepSeek']",
-            "textarea[placeholder*='Message']", 
-            "textarea",
-            "div[contenteditable='true']",
-            "div[role='textbox']"
-        ]
-        
-        end = time.time() + timeout
-        while time.time() < end:
+        from selenium.webdriver.common.by import By
+
+        selectors = _INPUT_BOX_SELECTORS
+
+        def scan():
             try:
                 for sel in selectors:
                     elems = self.driver.find_elements(By.CSS_SELECTOR, sel)
@@ -873,20 +2121,33 @@ ADDITIONAL SCENARIO RULES:
                                 sel != "textarea[placeholder*='Message DeepSeek']"):  # Fallback cases
                                 
                                 if e.is_displayed() and e.is_enabled():
-                                    if self.verbose:
-                                        print(f"✅ Found input box with selector: {sel}")
+                                    self._log(f"Found input box with selector: {sel}")
                                     return e
                         except:
                             # If we can't get placeholder, still try the element
                             if e.is_displayed() and e.is_enabled():
-                                if self.verbose:
-                                    print(f"✅ Found input box (fallback): {sel}")
+                                self._log(f"Found input box (fallback): {sel}")
                                 return e
             except Exception as e:
-                if self.verbose:
-                    print(f"⚠️ Selector attempt failed: {e}")
-                pass
-            time.sleep(0.3)
+                self._log(f"Selector attempt failed: {e}")
+            return None
+
+        def resolve():
+            cache = self._input_box_cache
+            lookups = cache.stats['lookups']
+            try:
+                element = cache.resolve(self.driver)
+            except Exception:
+                # Script lookups unavailable, scan with plain WebDriver calls
+                return scan()
+            if element is not None and cache.stats['lookups'] != lookups:
+                self._log(f"Found input box with selector: {cache.learned}")
+            return element
+
+        # Returns the moment the box is interactable, polling at the learned pace
+        found = self.waiter.wait("input_box", resolve, timeout)
+        if found:
+            return found
         
         # Final attempt with more specific targeting
         try:
@@ -896,8 +2157,7 @@ ADDITIONAL SCENARIO RULES:
                 if textarea.is_displayed() and textarea.is_enabled():
                     placeholder = textarea.get_attribute('placeholder') or ''
                     if any(msg in placeholder for msg in ['Message', 'DeepSeek', '消息']):
-                        if self.verbose:
-                            print("✅ Found input box via textarea search")
+                        self._log("Found input box via textarea search")
                         return textarea
         except:
             pass
@@ -951,6 +2211,7 @@ ADDITIONAL SCENARIO RULES:
                 element.clear()
                 try:
                     import pyperclip
+                    from selenium.webdriver.common.keys import Keys
                     pyperclip.copy(safe_text)
                     element.send_keys(Keys.CONTROL, 'v')
                 except ImportError:
@@ -975,75 +2236,201 @@ ADDITIONAL SCENARIO RULES:
             self.send_text_with_emojis(element, formatted_text)
             return
 
-        self.animation_running = True
-        self.chars_typed = 0
-
-        def run_animation():
-            animation = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
-            i = 0
-            while self.animation_running:
-                progress = int((self.chars_typed / total_chars) * 100)
-                sys.stdout.write(f"\r{message} {animation[i % len(animation)]} {progress}%")
-                sys.stdout.flush()
-                time.sleep(0.08)
-                i += 1
-            sys.stdout.write(f"\r{message} [COMPLETE] 100%\n")
-            sys.stdout.flush()
+        # Drawn by the shared progress thread, typing never waits on it
+        with progress.task(message) as task:
+            task.update(0)
+            self.send_text_with_emojis(element, formatted_text)
+            task.update(len(display_text) / total_chars)
 
-        animation_thread = threading.Thread(target=run_animation)
-        animation_thread.daemon = True
-        animation_thread.start()
+    # Event-driven capture
+    def _start_observer_capture(self):
+        """Inject the MutationObserver that buffers text deltas of the newest message"""
+        try:
+            return bool(self.driver.execute_script(_OBSERVER_INSTALL_JS))
+        except Exception as e:
+            self._log(f"Observer capture unavailable, polling instead: {e}")
+            return False
 
+    def _drain_observer_capture(self, text):
+        """Apply the buffered [keep, append] edits to text with a single script call"""
+        ops = self.driver.execute_script(_OBSERVER_DRAIN_JS)
+        if ops is None:
+            raise RuntimeError("Observer capture state lost (page navigated?)")
+        for keep, append in ops:
+            text = text[:keep] + append
+        return text
+
+    # Network stream capture
+    def _arm_network_capture(self):
+        """Start listening for the completion request; called right before a prompt is submitted"""
+        self._network_armed = False
+        if self.capture_mode != "network":
+            return
         try:
-            self.send_text_with_emojis(element, formatted_text)
-            self.chars_typed = total_chars
-        finally:
-            self.animation_running = False
-            animation_thread.join(timeout=0.2)
+            if self._network_capture is None or self._network_capture.driver is not self.driver:
+                self._network_capture = NetworkStreamCapture(self.driver, self.network_url_pattern)
+            self._network_capture.start()
+            self._network_armed = True
+        except Exception as e:
+            self._log(f"Network capture unavailable, reading the page instead: {e}")
+
+    def _network_reader(self, wait_for_request=5):
+        """Reader for stream_response that decodes the captured completion stream"""
+        capture = self._network_capture
+        started = time.time()
+
+        def read():
+            if self._network_armed:
+                try:
+                    text = capture.poll()
+                    if capture.request_id is not None or time.time() - started < wait_for_request:
+                        return text.strip()
+                    self._log("No completion stream seen, reading the page instead.")
+                except Exception as e:
+                    self._log(f"Network capture failed, reading the page instead: {e}")
+                # Fall back to the DOM for the rest of this reply
+                self._network_armed = False
+            return self.get_latest_response_text()
+
+        return read
+
+    def _response_reader(self):
+        """Return the function stream_response uses to read the latest reply text"""
+        if self.capture_mode == "network" and self._network_armed:
+            return self._network_reader()
+        if self.capture_mode != "observer" or not self._start_observer_capture():
+            return self.get_latest_response_text
+
+        captured = {'text': ''}
+
+        def read():
+            try:
+                captured['text'] = self._drain_observer_capture(captured['text'])
+            except Exception:
+                # Page reloaded under us, re-arm and fall back for this tick
+                if self._start_observer_capture():
+                    captured['text'] = ''
+                return self.get_latest_response_text()
+            return captured['text'].strip()
+
+        return read
 
     # Response streaming
-    def stream_response(self, check_interval=0.45, timeout=60):
+    def _generation_state(self):
+        """'generating', 'done' or 'unknown', read from the chat UI itself (or the captured stream)"""
+        capture = self._network_capture
+        if self._network_armed and capture is not None and capture.request_id is not None:
+            return 'done' if capture.done else 'generating'
+        try:
+            return self.driver.execute_script(
+                _GENERATION_STATE_JS,
+                _STOP_CONTROL_SELECTORS, _STREAMING_MESSAGE_SELECTORS, _MESSAGE_ACTION_SELECTORS
+            ) or 'unknown'
+        except Exception:
+            return 'unknown'
+
+    def stream_response(self, check_interval=None, timeout=None):
         """Stream assistant output until it stabilizes or timeout."""
+        responses = self._iter_response(check_interval, timeout)
+        while True:
+            try:
+                next(responses)
+            except StopIteration as done:
+                return done.value
+
+    def _iter_response(self, check_interval=None, timeout=None):
+        """
+        Generator behind stream_response: yields the reply text whenever it changes, returns the final text.
+
+        The reply is finished when the UI says so (stop control gone, action bar shown). The
+        stability heuristic is only used while the UI state is unknown. `timeout` (default
+        response_timeout) is the allowed time without progress, capped by max_response_time.
+        """
         start_time = time.time()
+        idle_timeout = self.response_timeout if timeout is None else timeout
+        hard_deadline = start_time + max(self.max_response_time, idle_timeout)
+        deadline = start_time + idle_timeout
         last_text = ""
-        if self.verbose:
-            print("\nAssistant: ", end="", flush=True)
+        read_reply = self._response_reader()
+        extraction_time = [0.0]
+
+        def read_text():
+            started = time.perf_counter()
+            try:
+                return read_reply()
+            finally:
+                extraction_time[0] += time.perf_counter() - started
+        if check_interval is None:
+            # Observer drains are cheap, so poll them more often
+            check_interval = 0.15 if self.capture_mode == "observer" else 0.45
+        thinking = progress.task("Assistant is thinking") if self.verbose else None
 
         initial_wait = 0
         current_text = ""
-        while initial_wait < 80:
-            current_text = self.get_latest_response_text()
+        while initial_wait < 80 and not self._cancel_event.is_set():
+            current_text = read_text()
             if current_text.strip():
                 break
             time.sleep(0.1)
             initial_wait += 1
 
-        if not current_text.strip() and self.verbose:
-            self.quick_loading("Assistant is thinking")
-            time.sleep(0.6)
+        ended_by = 'timeout'
+
+        if thinking:
+            thinking.done("[RESPONDING]" if current_text.strip() else "[STILL WAITING]")
+            print("\nAssistant: ", end="", flush=True)
 
-        last_text = self.get_latest_response_text()
-        if last_text and self.verbose:
-            print(last_text.replace('\n', """
+        last_text = read_text()
+        if last_text:
+            if self.verbose:
+                print(last_text.replace('\n', """
 """), end="", flush=True)
+            yield last_text
 
         stable_since = time.time()
-        while time.time() - start_time < timeout:
+        while time.time() < deadline:
+            if self._cancel_event.is_set():
+                ended_by = 'cancelled'
+                break
             try:
-                current_text = self.get_latest_response_text()
+                current_text = read_text()
+                now = time.time()
                 if current_text != last_text:
                     new_piece = current_text[len(last_text):] if last_text and current_text.startswith(last_text) else current_text
                     if self.verbose:
                         print(new_piece, end="", flush=True)
                     last_text = current_text
-                    stable_since = time.time()
+                    stable_since = now
+                    deadline = min(hard_deadline, now + idle_timeout)
+                    yield last_text
                 else:
-                    if time.time() - stable_since > 1.2:
+                    # Only ask the UI when the text has not moved this tick
+                    state = self._generation_state()
+                    if state == 'generating':
+                        deadline = min(hard_deadline, now + idle_timeout)
+                    elif state == 'done' and last_text.strip():
+                        # Pick up anything rendered between the last read and the UI settling
+                        final_text = read_text()
+                        if final_text != last_text:
+                            last_text = final_text
+                            yield last_text
+                        ended_by = 'ui'
+                        break
+                    elif state != 'generating' and now - stable_since > self.stability_window:
+                        ended_by = 'stability'
                         break
                 time.sleep(check_interval)
             except Exception:
+                ended_by = 'error'
                 break
 
+        if self._cancel_event.is_set():
+            ended_by = 'cancelled'
+            self._stop_generation()
+        if ended_by in self.completion_stats:
+            self.completion_stats[ended_by] += 1
+        self._add_timing('extraction', extraction_time[0])
+
         if self.verbose:
             generation_time = time.time() - start_time
             print(f" (generated in: {generation_time:.1f}s)")
@@ -1058,8 +2445,9 @@ ADDITIONAL SCENARIO RULES:
     # Public API - all original methods preserved
     def is_logged_in(self):
         try:
+            with self._op_lock:
+                self._ensure_browser()
             self.driver.get(self.base_url)
-            time.sleep(1.2)
             try:
                 _ = self.find_input_box(timeout=4)
                 return True
@@ -1074,28 +2462,53 @@ ADDITIONAL SCENARIO RULES:
         self._log("2. Manually login and solve any CAPTCHA")
         self._log("3. Come back here and press Enter")
 
+        with self._op_lock:
+            self._ensure_browser()
         self.driver.get(self.base_url)
         input("Press Enter AFTER you've logged in manually (and solved any CAPTCHA)...")
 
         if self.is_logged_in():
             self.save_session_data()
-            if self.verbose:
-                self.loading_animation("Saving session", 0.6)
             self._log("Setup complete! You'll be auto-logged in from now on.")
             return True
         else:
             self._log("Login doesn't appear successful. Please try again.")
             return False
 
+    @property
+    def chat_history(self):
+        """The current conversation's turns in history_store (a live list-like view)"""
+        return ChatHistory(self.history_store, self.conversation_id)
+
+    @chat_history.setter
+    def chat_history(self, messages):
+        history = self.chat_history
+        history.clear()
+        history.extend(messages)
+
+    def switch_conversation(self, conversation_id):
+        """Continue another conversation of history_store; the next message re-seeds the chat"""
+        if conversation_id == self.conversation_id:
+            return False
+        self.conversation_id = conversation_id
+        if self.history_packer is not None:
+            self.history_packer.reset()
+        self._conversation = None
+        return True
+
     def get_chat_history(self):
+        """The current conversation as a plain list (JSON-serialisable)"""
         return self.chat_history.copy()
 
     def clear_chat_history(self):
         self.chat_history = []
+        if self.history_packer is not None:
+            self.history_packer.reset()
+        self._conversation = None
         if self.driver:
             try:
-                self.driver.get(self.base_url)
-                time.sleep(0.6)
+                if not self._open_new_chat():
+                    self._wait_page_ready()
             except Exception:
                 pass
         return True
@@ -1106,20 +2519,19 @@ ADDITIONAL SCENARIO RULES:
     def set_user_context_directly(self, key, value):
         self.user_context[key] = value
         self.user_context["last_updated"] = datetime.now().isoformat()
-        self.save_user_context()
+        self.save_user_context([key, "last_updated"])
         return True
 
     def delete_user_context(self, key):
         if key in self.user_context:
             del self.user_context[key]
-            self.save_user_context()
+            self.save_user_context([key])
             return True
         return False
 
     def update_instructions(self, new_instructions):
         self.instructions = new_instructions
-        if self.verbose:
-            print(f"Instructions updated: {self.instructions}")
+        self._log(f"Instructions updated: {self.instructions}")
 
 # Example usage demonstrating the enhanced command system
 def example_usage():
@@ -0,0 +1,220 @@
+"""
+AetherLink for asyncio
+
+Async facade over AetherLink. All blocking Selenium work for one browser runs
+on that browser's own dedicated thread, so the event loop never stalls and
+one loop can drive many browsers (see AsyncAetherLinkPool).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import threading
+
+from aetherlink.aetherlink import AetherLink
+from aetherlink.pool import AetherLinkPool
+
+_STREAM_DONE = object()
+
+
+class _StreamError:
+    def __init__(self, error):
+        self.error = error
+
+
+class AsyncAetherLink:
+    def __init__(self, link, executor=None):
+        """
+        Wrap an existing AetherLink. Prefer `await AsyncAetherLink.create(...)`,
+        which also starts the browser without blocking the loop.
+        """
+        self.link = link
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="aetherlink-browser")
+
+    @classmethod
+    async def create(cls, **aetherlink_kwargs):
+        """Start an AetherLink (and its Chrome) on a dedicated thread"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aetherlink-browser")
+        loop = asyncio.get_running_loop()
+        try:
+            link = await loop.run_in_executor(executor, functools.partial(AetherLink, **aetherlink_kwargs))
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+        return cls(link, executor)
+
+    async def run(self, func, *args, timeout=None, cancel_event=None, **kwargs):
+        """
+        Run `func(*args, **kwargs)` on this browser's thread.
+
+        On timeout or cancellation the call is dropped if it has not started yet and
+        otherwise asked to stop (cancel_event is set, without one AetherLink.cancel() is
+        called); asyncio.TimeoutError / CancelledError is raised.
+        """
+        job = self._executor.submit(functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            if not job.cancel():
+                if cancel_event is not None:
+                    cancel_event.set()
+                else:
+                    self.link.cancel()
+            raise
+
+    async def send_message(self, message, timeout=None):
+        """Async send_message; cancelling the awaiting task stops the browser-side stream"""
+        cancel_event = threading.Event()
+        return await self.run(functools.partial(self.link.send_message, message, cancel_event=cancel_event),
+                              timeout=timeout, cancel_event=cancel_event)
+
+    async def stream(self, message, timeout=None):
+        """
+        Async generator of visible text deltas and STREAM_RESET events (see AetherLink.send_message_stream).
+        `timeout` bounds the whole reply. Leaving the loop early cancels the reply.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        # This stream's own token: still honoured if the stream has not started yet
+        cancel_event = threading.Event()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+        def produce():
+            try:
+                for delta in self.link.send_message_stream(message, cancel_event=cancel_event):
+                    put(delta)
+            except BaseException as e:
+                put(_StreamError(e))
+            finally:
+                put(_STREAM_DONE)
+
+        job = self._executor.submit(produce)
+        deadline = None if timeout is None else loop.time() + timeout
+        finished = False
+        try:
+            while True:
+                remaining = None if deadline is None else max(0, deadline - loop.time())
+                item = await asyncio.wait_for(queue.get(), remaining)
+                if item is _STREAM_DONE:
+                    finished = True
+                    return
+                if isinstance(item, _StreamError):
+                    finished = True
+                    raise item.error
+                yield item
+        finally:
+            if not finished:
+                # Queued behind earlier work: never run it. Running: stop it and the page.
+                job.cancel()
+                cancel_event.set()
+
+    async def load_session_data(self):
+        return await self.run(self.link.load_session_data)
+
+    async def is_logged_in(self):
+        return await self.run(self.link.is_logged_in)
+
+    async def clear_chat_history(self):
+        return await self.run(self.link.clear_chat_history)
+
+    async def close(self):
+        """Close the browser and stop its thread"""
+        try:
+            await self.run(self.link.close)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+class AsyncAetherLinkPool:
+    def __init__(self, pool):
+        """Wrap an AetherLinkPool. Prefer `await AsyncAetherLinkPool.create(...)`."""
+        self.pool = pool
+        self._clients = {id(slot.link): AsyncAetherLink(slot.link) for slot in pool._slots}
+        self._waiting = 0
+        self._loop = None
+        self._condition = None
+
+    @classmethod
+    async def create(cls, size=2, **pool_kwargs):
+        """Start an AetherLinkPool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        pool = await loop.run_in_executor(None, functools.partial(AetherLinkPool, size=size, **pool_kwargs))
+        return cls(pool)
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._loop = asyncio.get_running_loop()
+            self._condition = asyncio.Condition()
+            # Releases can come from any thread (sync pool users too)
+            self.pool.add_release_listener(
+                lambda: self._loop.call_soon_threadsafe(lambda: self._loop.create_task(self._notify()))
+            )
+        return self._condition
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify()
+
+    async def acquire(self, timeout=None):
+        """Wait for an idle worker and return its AsyncAetherLink"""
+        condition = self._get_condition()
+
+        async def wait_for_worker():
+            async with condition:
+                while True:
+                    link = self.pool.acquire(blocking=False)
+                    if link is not None:
+                        return link
+                    await condition.wait()
+
+        self._waiting += 1
+        try:
+            link = await asyncio.wait_for(wait_for_worker(), timeout)
+        finally:
+            self._waiting -= 1
+        return self._clients[id(link)]
+
+    def release(self, client):
+        """Return a worker to the pool"""
+        self.pool.release(client.link)
+
+    @asynccontextmanager
+    async def worker(self, timeout=None):
+        """`async with pool.worker() as bot: await bot.send_message(...)`"""
+        client = await self.acquire(timeout=timeout)
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    async def send_message(self, message, timeout=None):
+        """Send on the next free worker; `timeout` covers only the reply, not the wait for a worker"""
+        async with self.worker() as client:
+            return await client.send_message(message, timeout=timeout)
+
+    async def stream(self, message, timeout=None):
+        """Stream a reply from the next free worker"""
+        async with self.worker() as client:
+            async for delta in client.stream(message, timeout=timeout):
+                yield delta
+
+    def get_stats(self):
+        """AetherLinkPool stats, with async waiters included in queue_depth"""
+        stats = self.pool.get_stats()
+        stats['queue_depth'] += self._waiting
+        return stats
+
+    async def close(self):
+        """Close every browser and its thread"""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.pool.close)
+        finally:
+            for client in self._clients.values():
+                client._executor.shutdown(wait=False)
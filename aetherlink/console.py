@@ -0,0 +1,114 @@
+"""
+AetherLink Console Output
+
+Everything AetherLink reports goes through the "aetherlink" logger. verbose=True
+only attaches a console handler when the application has not configured
+logging itself.
+
+Progress spinners are drawn by a single shared renderer thread. Callers report
+real progress (start, fraction done, finished) and never wait on the display,
+so progress output costs no wall-clock time.
+"""
+import logging
+import sys
+import threading
+
+logger = logging.getLogger("aetherlink")
+
+_console_lock = threading.Lock()
+_console_handler = None
+
+
+def enable_console_logging(level=logging.INFO):
+    """Print aetherlink log records to stdout, unless logging is already configured"""
+    global _console_handler
+    with _console_lock:
+        if _console_handler is not None or logger.handlers or logging.getLogger().handlers:
+            return
+        _console_handler = logging.StreamHandler(sys.stdout)
+        _console_handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+        logger.addHandler(_console_handler)
+        if logger.level == logging.NOTSET:
+            logger.setLevel(level)
+
+
+class ProgressTask:
+    def __init__(self, renderer, message):
+        self.renderer = renderer
+        self.message = message
+        self.fraction = None
+        self.finished = False
+
+    def update(self, fraction):
+        """Report how far along the task is (0.0 - 1.0)"""
+        self.fraction = max(0.0, min(1.0, fraction))
+
+    def done(self, status="[COMPLETE]"):
+        self.renderer._finish(self, status)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.finished:
+            self.done("[FAILED]" if exc_type else "[COMPLETE]")
+
+
+class ProgressRenderer:
+    frames = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+    def __init__(self, interval=0.08):
+        """One thread draws the newest running task; it sleeps while nothing runs"""
+        self.interval = interval
+        self._tasks = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._line_length = 0
+
+    def _write(self, line, end=""):
+        # Pad over whatever the previous spinner frame left on the line
+        try:
+            sys.stdout.write(f"\r{line.ljust(self._line_length)}{end}")
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            # Closed or broken stdout: progress output is never worth failing for
+            pass
+        self._line_length = 0 if end else len(line)
+
+    def task(self, message):
+        """Start showing a spinner for `message`; finish it with task.done() or a with block"""
+        task = ProgressTask(self, message)
+        with self._cond:
+            self._tasks.append(task)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="aetherlink-progress", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return task
+
+    def _finish(self, task, status):
+        with self._cond:
+            if task.finished:
+                return
+            task.finished = True
+            self._tasks.remove(task)
+            self._write(f"{task.message} {status}", end="\n")
+            self._cond.notify()
+
+    def _run(self):
+        frame = 0
+        with self._cond:
+            while True:
+                while not self._tasks:
+                    self._cond.wait()
+                task = self._tasks[-1]
+                line = f"{task.message} {self.frames[frame % len(self.frames)]}"
+                if task.fraction is not None:
+                    line += f" {int(task.fraction * 100)}%"
+                self._write(line)
+                frame += 1
+                self._cond.wait(self.interval)
+
+
+# Shared by every AetherLink in the process
+progress = ProgressRenderer()
@@ -0,0 +1,304 @@
+"""
+AetherLink Chat History
+
+Where chat turns live. AetherLink.chat_history is a live list-like view of
+one conversation in a history store: reads fetch only the turns they need
+and edits go straight to the store. get_chat_history() returns a plain list.
+Several instances (or pool workers) can share a store and keep apart by
+conversation id.
+
+    InMemoryHistory   plain lists, lost with the process (the default)
+    SQLiteHistory     append-only SQLite log with a bounded in-memory window
+                      of the newest turns per conversation, so prompt building
+                      rarely touches the disk and a restarted bot resumes where
+                      it stopped
+
+A store implements append, count, get, splice, clear, conversations and
+close; indexes are positions within the conversation, oldest first.
+"""
+from collections import OrderedDict, deque
+from itertools import islice
+import threading
+import time
+
+from aetherlink.persistence import requirements_path
+
+
+class ChatHistory:
+    def __init__(self, store, conversation_id):
+        """The turns of one conversation, indexed and sliced like a list"""
+        self.store = store
+        self.conversation_id = conversation_id
+
+    def append(self, message):
+        self.store.append(self.conversation_id, message)
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def clear(self):
+        self.store.clear(self.conversation_id)
+
+    def copy(self):
+        return self.store.get(self.conversation_id, 0, len(self))
+
+    def _position(self, index, count):
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("chat history index out of range")
+        return index
+
+    def insert(self, index, message):
+        count = len(self)
+        index = max(0, min(count, index + count if index < 0 else index))
+        self.store.splice(self.conversation_id, index, index, [message])
+
+    def pop(self, index=-1):
+        count = len(self)
+        if not count:
+            raise IndexError("pop from empty chat history")
+        index = self._position(index, count)
+        message = self.store.get(self.conversation_id, index, index + 1)[0]
+        self.store.splice(self.conversation_id, index, index + 1, [])
+        return message
+
+    def remove(self, message):
+        self.pop(self.index(message))
+
+    def index(self, message):
+        for position, candidate in enumerate(self):
+            if candidate == message:
+                return position
+        raise ValueError("message is not in the chat history")
+
+    def count(self, message):
+        return sum(1 for candidate in self if candidate == message)
+
+    def tail(self, n):
+        """The newest `n` turns"""
+        count = len(self)
+        return self.store.get(self.conversation_id, max(0, count - n), count)
+
+    def __len__(self):
+        return self.store.count(self.conversation_id)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        count = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(count)
+            if step == 1:
+                return self.store.get(self.conversation_id, start, max(start, stop))
+            return self.copy()[index]
+        index = self._position(index, count)
+        return self.store.get(self.conversation_id, index, index + 1)[0]
+
+    def __setitem__(self, index, value):
+        count = len(self)
+        if not isinstance(index, slice):
+            index = self._position(index, count)
+            self.store.splice(self.conversation_id, index, index + 1, [value])
+            return
+        start, stop, step = index.indices(count)
+        value = list(value)
+        if step == 1:
+            self.store.splice(self.conversation_id, start, max(start, stop), value)
+            return
+        positions = range(start, stop, step)
+        if len(value) != len(positions):
+            raise ValueError(f"attempt to assign {len(value)} messages to an extended slice of {len(positions)}")
+        for position, message in zip(positions, value):
+            self.store.splice(self.conversation_id, position, position + 1, [message])
+
+    def __delitem__(self, index):
+        count = len(self)
+        if not isinstance(index, slice):
+            index = self._position(index, count)
+            self.store.splice(self.conversation_id, index, index + 1, [])
+            return
+        start, stop, step = index.indices(count)
+        if step == 1:
+            self.store.splice(self.conversation_id, start, max(start, stop), [])
+            return
+        # Highest first, so the positions still to delete do not move
+        for position in sorted(range(start, stop, step), reverse=True):
+            self.store.splice(self.conversation_id, position, position + 1, [])
+
+    def __iadd__(self, messages):
+        self.extend(messages)
+        return self
+
+    def __add__(self, other):
+        return self.copy() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.copy()
+
+    def __eq__(self, other):
+        if isinstance(other, ChatHistory):
+            other = other.copy()
+        return self.copy() == other if isinstance(other, list) else NotImplemented
+
+    def __iter__(self, chunk=256):
+        for start in range(0, len(self), chunk):
+            yield from self.store.get(self.conversation_id, start, start + chunk)
+
+    def __repr__(self):
+        return f"ChatHistory({self.conversation_id!r}, {len(self)} messages)"
+
+
+class InMemoryHistory:
+    def __init__(self):
+        self._conversations = {}
+        self._lock = threading.Lock()
+
+    def append(self, conversation_id, message):
+        with self._lock:
+            self._conversations.setdefault(conversation_id, []).append(
+                {"role": message["role"], "content": message["content"]})
+
+    def count(self, conversation_id):
+        return len(self._conversations.get(conversation_id, ()))
+
+    def get(self, conversation_id, start, stop):
+        with self._lock:
+            return list(self._conversations.get(conversation_id, [])[start:stop])
+
+    def splice(self, conversation_id, start, stop, messages):
+        """Replace turns [start, stop) with `messages`"""
+        messages = [{"role": m["role"], "content": m["content"]} for m in messages]
+        with self._lock:
+            self._conversations.setdefault(conversation_id, [])[start:stop] = messages
+
+    def clear(self, conversation_id):
+        with self._lock:
+            self._conversations.pop(conversation_id, None)
+
+    def conversations(self):
+        return list(self._conversations)
+
+    def close(self):
+        pass
+
+
+class SQLiteHistory:
+    def __init__(self, path=None, window=200, max_cached_conversations=1000):
+        """
+        Args:
+            path (str): SQLite database file (default: chat_history.db in AetherLink_Requirements)
+            window (int): Newest turns kept in memory per conversation
+            max_cached_conversations (int): Conversations whose window is kept (least recently used go first)
+        """
+        self.path = path or requirements_path("chat_history.db")
+        self.window = window
+        self.max_cached_conversations = max_cached_conversations
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()  # conversation_id -> {'count': n, 'window': deque}
+        self.stats = {'window_reads': 0, 'disk_reads': 0}
+        import sqlite3
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL: appends are cheap and a crash loses at most the turn being written
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                conversation TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (conversation, seq)
+            )""")
+        self._db.commit()
+
+    def _entry(self, conversation_id):
+        """The cached count and window of a conversation, loaded from disk on first use"""
+        entry = self._cache.get(conversation_id)
+        if entry is not None:
+            self._cache.move_to_end(conversation_id)
+            return entry
+        row = self._db.execute("SELECT MAX(seq) FROM messages WHERE conversation = ?",
+                               (conversation_id,)).fetchone()
+        count = 0 if row[0] is None else row[0] + 1
+        rows = self._db.execute(
+            "SELECT role, content FROM messages WHERE conversation = ? AND seq >= ? ORDER BY seq",
+            (conversation_id, max(0, count - self.window))).fetchall()
+        entry = self._cache[conversation_id] = {
+            'count': count,
+            'window': deque(({"role": role, "content": content} for role, content in rows), maxlen=self.window),
+        }
+        while len(self._cache) > self.max_cached_conversations:
+            self._cache.popitem(last=False)
+        return entry
+
+    def append(self, conversation_id, message):
+        message = {"role": message["role"], "content": message["content"]}
+        with self._lock:
+            entry = self._entry(conversation_id)
+            with self._db:
+                self._db.execute(
+                    "INSERT INTO messages (conversation, seq, role, content, created) VALUES (?, ?, ?, ?, ?)",
+                    (conversation_id, entry['count'], message["role"], message["content"], time.time()))
+            entry['count'] += 1
+            entry['window'].append(message)
+
+    def count(self, conversation_id):
+        with self._lock:
+            return self._entry(conversation_id)['count']
+
+    def get(self, conversation_id, start, stop):
+        with self._lock:
+            entry = self._entry(conversation_id)
+            stop = min(stop, entry['count'])
+            if start >= stop:
+                return []
+            window_start = entry['count'] - len(entry['window'])
+            messages = []
+            if start < window_start:
+                self.stats['disk_reads'] += 1
+                rows = self._db.execute(
+                    "SELECT role, content FROM messages WHERE conversation = ? AND seq >= ? AND seq < ? "
+                    "ORDER BY seq", (conversation_id, start, min(stop, window_start))).fetchall()
+                messages = [{"role": role, "content": content} for role, content in rows]
+            if stop > window_start:
+                self.stats['window_reads'] += 1
+                messages.extend(islice(entry['window'], max(0, start - window_start), stop - window_start))
+            return messages
+
+    def splice(self, conversation_id, start, stop, messages):
+        """Replace turns [start, stop) with `messages`; the turns after them are renumbered"""
+        now = time.time()
+        rows = [(m["role"], m["content"], now) for m in messages]
+        with self._lock:
+            count = self._entry(conversation_id)['count']
+            start = min(start, count)
+            stop = min(max(start, stop), count)
+            rows += self._db.execute(
+                "SELECT role, content, created FROM messages WHERE conversation = ? AND seq >= ? ORDER BY seq",
+                (conversation_id, stop)).fetchall()
+            with self._db:
+                self._db.execute("DELETE FROM messages WHERE conversation = ? AND seq >= ?", (conversation_id, start))
+                self._db.executemany(
+                    "INSERT INTO messages (conversation, seq, role, content, created) VALUES (?, ?, ?, ?, ?)",
+                    [(conversation_id, start + i, role, content, created)
+                     for i, (role, content, created) in enumerate(rows)])
+            # Reloaded on next use
+            self._cache.pop(conversation_id, None)
+
+    def clear(self, conversation_id):
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM messages WHERE conversation = ?", (conversation_id,))
+            self._cache.pop(conversation_id, None)
+
+    def conversations(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT conversation FROM messages")]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
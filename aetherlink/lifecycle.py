@@ -0,0 +1,131 @@
+"""
+AetherLink Browser Lifecycle
+
+Keeps long-running bots lean. A background thread looks at every managed
+AetherLink and
+  * recycles its browser after `max_messages` messages or once the Chrome
+    process tree grows past `max_rss_mb`
+  * hibernates browsers idle for longer than `idle_ttl` seconds
+
+A hibernated AetherLink starts its browser again, from the saved session, on
+its next message. Browsers that are busy are never touched, they are looked
+at again on the next check.
+"""
+import logging
+import threading
+import time
+
+from aetherlink.console import enable_console_logging
+
+logger = logging.getLogger("aetherlink.lifecycle")
+
+
+class BrowserLifecycle:
+    def __init__(self, links, max_messages=None, max_rss_mb=None, idle_ttl=None,
+                 check_interval=10, verbose=False):
+        """
+        Args:
+            links: An AetherLink, a list of them, or an AetherLinkPool
+            max_messages (int): Recycle after this many messages on one browser
+            max_rss_mb (float): Recycle once the browser's process tree uses more memory
+            idle_ttl (float): Hibernate after this many seconds without a message
+            check_interval (float): Seconds between checks of the background thread
+        """
+        self._source = links
+        self.max_messages = max_messages
+        self.max_rss_mb = max_rss_mb
+        self.idle_ttl = idle_ttl
+        self.check_interval = check_interval
+        self.verbose = verbose
+        if verbose:
+            enable_console_logging()
+        self.last_rss = {}
+        self.stats = {'checks': 0, 'recycled_messages': 0, 'recycled_memory': 0, 'hibernated': 0, 'errors': 0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _log(self, message):
+        logger.log(logging.INFO if self.verbose else logging.DEBUG, message)
+
+    def _links(self):
+        source = self._source
+        if hasattr(source, 'links'):
+            return list(source.links)
+        if isinstance(source, (list, tuple, set)):
+            return list(source)
+        return [source]
+
+    def check_link(self, link):
+        """
+        Apply the policy to one AetherLink now.
+
+        Returns:
+            str: 'hibernated', 'recycled_messages', 'recycled_memory' or None
+        """
+        if link.hibernated:
+            return None
+
+        if self.idle_ttl is not None and time.time() - link.last_used > self.idle_ttl:
+            if link.hibernate(blocking=False):
+                self.stats['hibernated'] += 1
+                return 'hibernated'
+            return None
+
+        if self.max_messages is not None and link.messages_since_start >= self.max_messages:
+            if link.recycle(blocking=False):
+                self.stats['recycled_messages'] += 1
+                return 'recycled_messages'
+            return None
+
+        if self.max_rss_mb is not None:
+            usage = link.get_memory_usage()
+            if usage is not None:
+                rss_mb = usage['rss_bytes'] / 2 ** 20
+                self.last_rss[id(link)] = rss_mb
+                if rss_mb > self.max_rss_mb:
+                    self._log(f"Browser uses {rss_mb:.0f} MB (limit {self.max_rss_mb:.0f} MB), recycling.")
+                    if link.recycle(blocking=False):
+                        self.stats['recycled_memory'] += 1
+                        return 'recycled_memory'
+        return None
+
+    def check(self):
+        """One pass over every managed AetherLink, returns {index: action} for what was done"""
+        self.stats['checks'] += 1
+        actions = {}
+        for index, link in enumerate(self._links()):
+            try:
+                action = self.check_link(link)
+            except Exception as e:
+                # A failed restart leaves the link hibernated; its next message retries
+                self.stats['errors'] += 1
+                self._log(f"Lifecycle action failed on worker {index}: {e}")
+                continue
+            if action:
+                self._log(f"Worker {index}: {action}")
+                actions[index] = action
+        return actions
+
+    def _run(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def start(self):
+        """Run check() every `check_interval` seconds on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="aetherlink-lifecycle", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
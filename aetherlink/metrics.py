@@ -0,0 +1,190 @@
+"""
+AetherLink Metrics
+
+Per-phase latency of send_message. Every phase is timed on each request and
+kept in a histogram (fixed buckets for Prometheus, plus a window of recent
+samples for p50/p90/p99). Hooks see every phase as it finishes.
+
+Phases:
+    navigation           preparing the conversation (new chat / page load)
+    find_input_box       locating the prompt box
+    text_injection       putting the prompt into the box
+    send                 submitting it, until generation has started
+    time_to_first_token  submit until the first reply text shows up
+    generation           first reply text until the reply is complete
+    extraction           reading reply text from the page (summed per request)
+    command_execution    running the commands found in the reply
+    reprompt             typing and sending the command results
+    final_stream         the whole reply to the reprompt
+    total                the whole send_message call
+
+The streaming phases (time_to_first_token, generation, final_stream) leave
+out the time a stream consumer spends between deltas; total includes it.
+"""
+from collections import deque
+import bisect
+import json
+import logging
+import threading
+
+logger = logging.getLogger("aetherlink.metrics")
+
+PHASES = (
+    'navigation', 'find_input_box', 'text_injection', 'send', 'time_to_first_token',
+    'generation', 'extraction', 'command_execution', 'reprompt', 'final_stream', 'total',
+)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=2048):
+        """
+        Args:
+            buckets (tuple): Upper bounds in seconds (+Inf is implied)
+            window (int): Recent samples kept for percentiles
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def percentile(self, q):
+        """q-th percentile (0-100) of the recent samples, None if there are none"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max if self.count else None,
+        }
+
+
+class Metrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS, window=2048):
+        self._buckets = buckets
+        self._window = window
+        self._histograms = {}
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """Call `hook(phase, seconds)` whenever a phase finishes (from the browser's thread)"""
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def emit(self, phase, seconds):
+        """Pass one finished phase to the hooks; a failing hook is logged and ignored"""
+        with self._lock:
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(phase, seconds)
+            except Exception as e:
+                logger.warning(f"Metrics hook failed: {e}")
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self._histograms.get(phase)
+            if histogram is None:
+                histogram = self._histograms[phase] = Histogram(self._buckets, self._window)
+            histogram.observe(seconds)
+
+    def record(self, timings):
+        """Add one request's {phase: seconds} to the histograms"""
+        for phase, seconds in timings.items():
+            self.observe(phase, seconds)
+
+    def snapshot(self):
+        """{phase: {count, sum, mean, p50, p90, p99, max}}"""
+        with self._lock:
+            return {phase: histogram.summary() for phase, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    # -----------------------
+    # Export
+    # -----------------------
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, name="aetherlink_phase_seconds"):
+        """Prometheus text exposition format (one histogram, labelled by phase)"""
+        lines = [
+            f"# HELP {name} Time spent in each send_message phase.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for phase, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {histogram.sum}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """
+        Serve /metrics (Prometheus text) and /metrics.json on a daemon thread.
+        Returns the server; call server.shutdown() to stop it.
+        """
+        # Imported here: http.server is slow to import and most processes never serve
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body, content_type = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                elif path == '/metrics.json':
+                    body, content_type = metrics.to_json(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="aetherlink-metrics", daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+        return server
+
+
+# Shared by every AetherLink that is not given its own Metrics
+default_metrics = Metrics()
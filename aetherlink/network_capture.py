@@ -0,0 +1,240 @@
+"""
+AetherLink Network Capture
+
+Reads the model output straight from the chat completion stream instead of
+scraping the rendered page. Chrome's performance log delivers the DevTools
+Network events; Network.streamResourceContent makes them carry the response
+bytes, which are decoded as Server-Sent Events into text deltas.
+
+The driver must be started with the 'goog:loggingPrefs' capability
+{'performance': 'ALL'} (AetherLink does this for capture_mode="network").
+"""
+import base64
+import codecs
+import json
+import re
+
+_THINKING_PATH = re.compile(r'think|reason', re.IGNORECASE)
+
+
+class SSEDecoder:
+    def __init__(self):
+        """Incremental SSE decoder: feed() raw bytes, get text deltas back"""
+        self._utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+        self._event = None
+        self._data = []
+        self._path = None
+        self._fragment_types = []
+        self.done = False
+
+    def feed(self, chunk):
+        """Decode a chunk of the stream, returns the list of new text deltas"""
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk)
+        self._buffer += chunk.replace('\r\n', '\n').replace('\r', '\n')
+
+        deltas = []
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            if line == '':
+                deltas.extend(self._dispatch())
+            elif line.startswith(':'):
+                continue
+            else:
+                field, _, value = line.partition(':')
+                if value.startswith(' '):
+                    value = value[1:]
+                if field == 'data':
+                    self._data.append(value)
+                elif field == 'event':
+                    self._event = value
+        return deltas
+
+    def _dispatch(self):
+        event, data = self._event, '\n'.join(self._data)
+        self._event, self._data = None, []
+        if event in ('close', 'finish', 'done'):
+            self.done = True
+            return []
+        if not data:
+            return []
+        if data.strip() == '[DONE]':
+            self.done = True
+            return []
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return []
+        return [delta for delta in self._extract(payload) if delta]
+
+    def _extract(self, payload):
+        """Pull answer text (not reasoning) out of one event payload"""
+        if not isinstance(payload, dict):
+            return []
+
+        # OpenAI-style: {"choices": [{"delta": {"content": "..."}}]}
+        choices = payload.get('choices')
+        if isinstance(choices, list):
+            out = []
+            for choice in choices:
+                delta = (choice or {}).get('delta') or {}
+                if isinstance(delta.get('content'), str):
+                    out.append(delta['content'])
+                if (choice or {}).get('finish_reason'):
+                    self.done = True
+            return out
+
+        # DeepSeek web patches: {"p": "response/...", "o": "APPEND", "v": ...};
+        # a patch without "p" continues the previous path
+        if 'v' in payload:
+            path = payload.get('p', self._path)
+            self._path = path
+            value = payload['v']
+            if payload.get('o') == 'BATCH' and isinstance(value, list):
+                out = []
+                for patch in value:
+                    if isinstance(patch, dict):
+                        if 'p' in patch and path:
+                            patch = dict(patch, p=f"{path}/{patch['p']}")
+                        out.extend(self._extract(patch))
+                self._path = path
+                return out
+            if isinstance(value, str):
+                if path and path.endswith('status'):
+                    if value.upper() == 'FINISHED':
+                        self.done = True
+                    return []
+                if path and _THINKING_PATH.search(path):
+                    return []
+                if path and re.search(r'fragments/(-?\d+)/content$', path):
+                    index = int(re.search(r'fragments/(-?\d+)/content$', path).group(1))
+                    if self._fragment_type(index) in ('THINK', 'THINKING'):
+                        return []
+                elif path and not path.endswith('content'):
+                    return []
+                return [value]
+            if isinstance(value, dict):
+                return self._extract_snapshot(value)
+            if isinstance(value, list) and path and path.endswith('fragments'):
+                return self._extract_fragments(value)
+            return []
+
+        for key in ('content', 'text', 'delta'):
+            if isinstance(payload.get(key), str):
+                return [payload[key]]
+        return []
+
+    def _fragment_type(self, index):
+        try:
+            return self._fragment_types[index]
+        except IndexError:
+            return None
+
+    def _extract_fragments(self, fragments):
+        # Patches without a path now continue the last fragment
+        self._path = 'response/fragments/-1/content'
+        out = []
+        for fragment in fragments:
+            if not isinstance(fragment, dict):
+                continue
+            kind = str(fragment.get('type', 'RESPONSE')).upper()
+            self._fragment_types.append(kind)
+            if kind not in ('THINK', 'THINKING') and isinstance(fragment.get('content'), str):
+                out.append(fragment['content'])
+        return out
+
+    def _extract_snapshot(self, value):
+        """Initial {"v": {"response": {...}}} snapshot sent at the start of a reply"""
+        response = value.get('response') if isinstance(value.get('response'), dict) else value
+        if isinstance(response.get('fragments'), list):
+            return self._extract_fragments(response['fragments'])
+        if isinstance(response.get('content'), str):
+            return [response['content']]
+        return []
+
+
+class NetworkStreamCapture:
+    def __init__(self, driver, url_pattern=r"/chat/completion"):
+        """
+        Args:
+            driver: Chrome WebDriver started with performance logging
+            url_pattern (str): Regex matched against request URLs to find the completion stream
+        """
+        self.driver = driver
+        self.url_pattern = re.compile(url_pattern)
+        self.reset()
+
+    def reset(self):
+        self.request_id = None
+        self.decoder = SSEDecoder()
+        self.text = ''
+        self.finished = False
+        self.failed = False
+        self._streaming = False
+
+    @property
+    def done(self):
+        return self.finished or self.decoder.done
+
+    def start(self):
+        """Forget earlier requests; call right before the prompt is submitted"""
+        self.reset()
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        # Drop buffered log entries that belong to earlier requests
+        self.driver.get_log('performance')
+
+    def _feed(self, raw, is_base64=True):
+        chunk = base64.b64decode(raw) if is_base64 else raw
+        for delta in self.decoder.feed(chunk):
+            self.text += delta
+
+    def _start_streaming(self, request_id):
+        self.request_id = request_id
+        try:
+            result = self.driver.execute_cdp_cmd('Network.streamResourceContent', {'requestId': request_id})
+            self._streaming = True
+            if result.get('bufferedData'):
+                self._feed(result['bufferedData'])
+        except Exception:
+            # Older Chrome: the body is read once the request has finished
+            self._streaming = False
+
+    def poll(self):
+        """Process new Network events, returns the full text decoded so far"""
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if self.request_id is None:
+                if method in ('Network.requestWillBeSent', 'Network.responseReceived'):
+                    url = (params.get('request') or params.get('response') or {}).get('url', '')
+                    if self.url_pattern.search(url):
+                        self._start_streaming(params['requestId'])
+                continue
+
+            if params.get('requestId') != self.request_id:
+                continue
+            if method == 'Network.dataReceived' and params.get('data'):
+                self._feed(params['data'])
+            elif method == 'Network.loadingFinished':
+                if not self._streaming:
+                    try:
+                        body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': self.request_id})
+                        if body.get('base64Encoded'):
+                            self._feed(body['body'])
+                        else:
+                            self._feed(body['body'].encode('utf-8'), is_base64=False)
+                    except Exception:
+                        self.failed = True
+                # Flush a final event that was not followed by a blank line
+                self._feed(b'\n\n', is_base64=False)
+                self.finished = True
+            elif method == 'Network.loadingFailed':
+                self.failed = True
+                self.finished = True
+        return self.text
@@ -0,0 +1,153 @@
+"""
+AetherLink History Packing
+
+Chooses which chat turns go into the system prompt. The newest turns are
+kept word for word while they fit a token budget; a single huge turn (a
+pasted log) is clipped instead of crowding out everything else. Turns that
+fall out of the window are folded into a rolling summary, once each, so the
+summary is refreshed incrementally rather than rebuilt on every message.
+
+Token counts are estimates (about four characters per token for ASCII, one
+per character otherwise); pass `tokenizer` for exact counts.
+"""
+import logging
+import re
+
+logger = logging.getLogger("aetherlink.packing")
+
+_WHITESPACE = re.compile(r'\s+')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+
+
+def estimate_tokens(text):
+    """Rough token count of `text`"""
+    if not text:
+        return 0
+    non_ascii = len(text) - len(text.encode('ascii', 'ignore'))
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def summarize_turns(summary, turns, line_chars=160):
+    """
+    Default summarizer: the previous summary plus one short line per turn
+    (its first sentence, clipped to `line_chars`).
+    """
+    lines = [summary] if summary else []
+    for role, content in turns:
+        text = _WHITESPACE.sub(' ', content.replace('\\n', ' ')).strip()
+        if not text:
+            continue
+        text = _SENTENCE_END.split(text, 1)[0]
+        if len(text) > line_chars:
+            text = text[:line_chars - 3].rstrip() + "..."
+        lines.append(f"{'User' if role == 'user' else 'Assistant'}: {text}")
+    return "\n".join(lines)
+
+
+def _newest_first(history, stop, start, chunk=32):
+    """history[start:stop] newest first, read a slice at a time (history may be disk-backed)"""
+    while stop > start:
+        begin = max(start, stop - chunk)
+        yield from reversed(history[begin:stop])
+        stop = begin
+
+
+class HistoryPacker:
+    def __init__(self, budget_tokens=1500, max_turn_tokens=None, summary_tokens=300,
+                 summarizer=None, tokenizer=None):
+        """
+        Args:
+            budget_tokens (int): Tokens for the verbatim turns
+            max_turn_tokens (int): Longer turns are clipped to this (default: half the budget)
+            summary_tokens (int): Cap of the rolling summary of older turns (0 disables it)
+            summarizer (callable): summarizer(previous_summary, [(role, content), ...]) -> str
+            tokenizer (callable): tokenizer(text) -> token count, instead of the estimate
+        """
+        self.budget_tokens = budget_tokens
+        self.max_turn_tokens = max_turn_tokens or max(1, budget_tokens // 2)
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or summarize_turns
+        self.count_tokens = tokenizer or estimate_tokens
+        self._token_counts = {}
+        self.reset()
+
+    def reset(self):
+        """Forget the summary (the history was cleared or replaced)"""
+        self.summary = ""
+        self._summarized = 0
+        self._last_summarized = None
+        self.last_pack = {'turns': 0, 'tokens': 0, 'clipped': 0, 'summarized': 0}
+
+    def _tokens(self, content):
+        count = self._token_counts.get(content)
+        if count is None:
+            count = self._token_counts[content] = self.count_tokens(content)
+        return count
+
+    def clip(self, content, tokens):
+        """Keep the start and the end of `content`, about `tokens` in total"""
+        total = self._tokens(content)
+        if total <= tokens:
+            return content
+        keep = max(0, int(len(content) * tokens / total) - 40)
+        head = keep * 2 // 3
+        tail = keep - head
+        omitted = len(content) - head - tail
+        return (content[:head] + f"\n[... {omitted} characters omitted ...]\n"
+                + (content[-tail:] if tail else ""))
+
+    def _fold(self, turns):
+        try:
+            summary = self.summarizer(self.summary, turns)
+        except Exception as e:
+            logger.warning(f"History summarizer failed, using the default: {e}")
+            summary = summarize_turns(self.summary, turns)
+        # Over the cap: drop the oldest lines first
+        while summary and self.count_tokens(summary) > self.summary_tokens:
+            if "\n" not in summary:
+                summary = self.clip(summary, self.summary_tokens)
+                break
+            summary = summary.split("\n", 1)[1]
+        self.summary = summary
+
+    def pack(self, history):
+        """
+        Returns (summary, turns): the rolling summary of older turns ("" if none)
+        and the newest [(role, content), ...] that fit the budget, oldest first.
+        """
+        # A shorter history or a different turn at the fold point means it was cleared/replaced
+        if self._summarized and (len(history) < self._summarized
+                                 or (history[self._summarized - 1]['role'],
+                                     history[self._summarized - 1]['content']) != self._last_summarized):
+            self.reset()
+
+        turns, used, clipped, live = [], 0, 0, set()
+        start = len(history)
+        for msg in _newest_first(history, start, self._summarized):
+            content = msg['content']
+            live.add(content)
+            tokens = self._tokens(content)
+            if tokens > self.max_turn_tokens or (not turns and tokens > self.budget_tokens):
+                content = self.clip(content, min(self.max_turn_tokens, self.budget_tokens))
+                tokens = self._tokens(content)
+                clipped += 1
+            if turns and used + tokens > self.budget_tokens:
+                break
+            turns.append((msg['role'], content))
+            used += tokens
+            start -= 1
+        turns.reverse()
+
+        if start > self._summarized:
+            if self.summary_tokens > 0:
+                self._fold([(msg['role'], msg['content']) for msg in history[self._summarized:start]])
+            self._summarized = start
+            self._last_summarized = (history[start - 1]['role'], history[start - 1]['content'])
+
+        # Only the counts of turns still in play are worth keeping
+        if len(self._token_counts) > 4 * max(len(turns), 8):
+            live.update(content for _, content in turns)
+            self._token_counts = {c: n for c, n in self._token_counts.items() if c in live}
+
+        self.last_pack = {'turns': len(turns), 'tokens': used, 'clipped': clipped, 'summarized': self._summarized}
+        return self.summary, turns
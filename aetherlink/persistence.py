@@ -0,0 +1,232 @@
+"""
+AetherLink Persistence
+
+Write-behind storage of a JSON dict (the user context). Changes are only
+recorded when they happen; a background thread writes them once the dict
+has been quiet for `delay` seconds (at most `max_delay` after the first
+change), and flush()/close() write at once.
+
+A write takes an exclusive lock next to the file, re-reads it and applies
+only the keys this process changed, so several worker processes can share
+one file without losing each other's keys. The new content goes to a temp
+file that replaces the old one, so readers never see half a file; the
+saved browser session (pickles) is written the same way.
+"""
+import atexit
+import json
+import logging
+import os
+import pickle
+import stat
+import threading
+import time
+import uuid
+import weakref
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no cross-process lock, writes stay atomic
+    fcntl = None
+
+logger = logging.getLogger("aetherlink.persistence")
+
+# Where AetherLink keeps its session, context and history files
+REQUIREMENTS_DIR = 'AetherLink_Requirements'
+
+_DELETED = object()
+
+# Open writers, flushed once at exit; weak so an unused writer can still be collected
+_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_writers():
+    for writer in list(_writers):
+        writer.flush()
+
+
+def requirements_path(name):
+    """`name` inside REQUIREMENTS_DIR, creating the directory if needed"""
+    os.makedirs(REQUIREMENTS_DIR, exist_ok=True)
+    return os.path.join(REQUIREMENTS_DIR, name)
+
+
+def read_json(path):
+    """The dict stored in `path`, {} if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write `data` to a temp file in the same directory and rename it over `path`"""
+    _write_atomic(path, lambda f: json.dump(data, f, indent=indent, ensure_ascii=False))
+
+
+def write_pickle_atomic(path, data):
+    """Like write_json_atomic, for pickled data (the saved browser session)"""
+    _write_atomic(path, lambda f: pickle.dump(data, f), binary=True)
+
+
+def _write_atomic(path, dump, binary=False):
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = os.path.join(directory, f"{os.path.basename(path)}.{uuid.uuid4().hex[:12]}.tmp")
+    # The replaced file keeps its mode; a new one gets the umask default, like open() would
+    # (mkstemp's 0600 would otherwise end up on the file)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding='utf-8')) as f:
+            dump(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class JsonFileLock:
+    def __init__(self, path):
+        """Exclusive lock on `path`.lock, shared by every process using the same file"""
+        self.path = path + '.lock'
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class WriteBehindJson:
+    def __init__(self, path, delay=0.5, max_delay=5.0, indent=2):
+        """
+        Args:
+            path (str): JSON file holding a dict
+            delay (float): Quiet time before pending changes are written (None: write at once)
+            max_delay (float): Longest a change waits while updates keep coming
+            indent (int): json indent of the file
+        """
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.indent = indent
+        self.stats = {'changes': 0, 'writes': 0, 'failures': 0}
+        self._pending = {}
+        self._replace = False
+        self._first_change = None
+        self._last_change = None
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        _writers.add(self)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def save(self, data, keys=None):
+        """
+        Record changes of `data` for writing: the given keys (missing ones are deleted
+        from the file) or, without keys, all of it (the file is replaced).
+        """
+        with self._cond:
+            if keys is None:
+                self._pending = {}
+                self._replace = True
+                keys = list(data)
+            for key in keys:
+                self._pending[key] = data[key] if key in data else _DELETED
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self.stats['changes'] += 1
+            if self.delay is not None and not self._closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="aetherlink-persist", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+                return
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._pending or self._replace) and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                while (self._pending or self._replace) and not self._closed:
+                    due = min(self._last_change + self.delay, self._first_change + self.max_delay)
+                    now = time.monotonic()
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Write pending changes now; returns False if the write failed (they stay pending)"""
+        with self._write_lock:
+            with self._cond:
+                if not self._pending and not self._replace:
+                    return True
+                changes, self._pending = self._pending, {}
+                replace, self._replace = self._replace, False
+                self._first_change = self._last_change = None
+            try:
+                with JsonFileLock(self.path):
+                    data = {} if replace else read_json(self.path)
+                    for key, value in changes.items():
+                        if value is _DELETED:
+                            data.pop(key, None)
+                        else:
+                            data[key] = value
+                    write_json_atomic(self.path, data, self.indent)
+                self.stats['writes'] += 1
+                return True
+            except Exception as e:
+                self.stats['failures'] += 1
+                logger.warning(f"Failed to write {self.path}: {e}")
+                with self._cond:
+                    # Newer changes of the same keys win
+                    if self._replace:
+                        changes = self._pending
+                    else:
+                        changes.update(self._pending)
+                    self._pending = changes
+                    self._replace = self._replace or replace
+                    if self._first_change is None:
+                        self._first_change = self._last_change = time.monotonic()
+                return False
+
+    def close(self):
+        """Write what is pending and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        result = self.flush()
+        _writers.discard(self)
+        return result
@@ -0,0 +1,257 @@
+"""
+AetherLink Pool
+
+Keeps several warm AetherLink browsers around and hands them out to callers,
+so independent conversations can run side by side instead of queueing behind
+a single Chrome driver.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import logging
+import os
+import threading
+import time
+
+from aetherlink.aetherlink import AetherLink
+from aetherlink.console import enable_console_logging
+
+logger = logging.getLogger("aetherlink.pool")
+
+
+class _WorkerSlot:
+    """Bookkeeping for one pooled AetherLink instance"""
+
+    def __init__(self, index, link):
+        self.index = index
+        self.link = link
+        self.busy = False
+        self.busy_since = None
+        self.busy_total = 0.0
+        self.messages = 0
+        self.messages_at_checkout = 0
+        self.started_at = time.time()
+
+
+class AetherLinkPool:
+    def __init__(self, size=2, headless=True, verbose=False, load_session=True,
+                 shared_user_context=False, **aetherlink_kwargs):
+        """
+        Start `size` warm AetherLink workers that share the saved session
+        (cookies + localstorage in AetherLink_Requirements/).
+
+        Every worker keeps its own chat history. Unless `shared_user_context`
+        is set, every worker also gets its own user context file
+        (user_context_worker<N>.json).
+
+        With `profile_template`, every worker runs on its own clone of that
+        logged-in Chrome profile (persistent <profile_dir>_worker<N> if
+        `profile_dir` is given, temporary otherwise) and skips session loading.
+        """
+        if size < 1:
+            raise ValueError("AetherLinkPool size must be at least 1")
+
+        self.size = size
+        self.verbose = verbose
+        if verbose:
+            enable_console_logging()
+        self._slots = []
+        self._idle = []
+        self._cond = threading.Condition()
+        self._waiting = 0
+        self._queued = 0
+        self._closed = False
+        self._release_listeners = []
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="aetherlink-pool")
+
+        user_context_file = aetherlink_kwargs.pop('user_context_file', 'user_context.json')
+        profile_dir = aetherlink_kwargs.pop('profile_dir', None)
+
+        def start_worker(index):
+            kwargs = dict(aetherlink_kwargs)
+            if shared_user_context:
+                kwargs['user_context_file'] = user_context_file
+            else:
+                root, ext = user_context_file.rsplit('.', 1) if '.' in user_context_file else (user_context_file, 'json')
+                kwargs['user_context_file'] = f"{root}_worker{index}.{ext}"
+            if profile_dir:
+                # Chrome locks a profile, so every worker needs its own
+                kwargs['profile_dir'] = f"{profile_dir.rstrip(os.sep)}_worker{index}"
+            link = AetherLink(headless=headless, verbose=verbose, **kwargs)
+            if load_session:
+                link.load_session_data()
+            return link
+
+        # Warm every browser in parallel, Chrome start-up dominates the cost
+        with ThreadPoolExecutor(max_workers=size) as starter:
+            futures = [starter.submit(start_worker, i) for i in range(size)]
+            errors = []
+            for index, future in enumerate(futures):
+                try:
+                    slot = _WorkerSlot(index, future.result())
+                    self._slots.append(slot)
+                    self._idle.append(slot)
+                except Exception as e:
+                    errors.append(e)
+
+        if errors:
+            self.close()
+            raise RuntimeError(f"Failed to start {len(errors)} of {size} pool workers: {errors[0]}")
+
+        self._log(f"Pool ready with {size} workers.")
+
+    def _log(self, message):
+        logger.log(logging.INFO if self.verbose else logging.DEBUG, message)
+
+    @property
+    def links(self):
+        """Every worker's AetherLink, busy or not"""
+        return [slot.link for slot in self._slots]
+
+    def _slot_for(self, link):
+        for slot in self._slots:
+            if slot.link is link:
+                return slot
+        raise ValueError("AetherLink instance does not belong to this pool")
+
+    # -----------------------
+    # Checkout / checkin
+    # -----------------------
+    def acquire(self, timeout=None, blocking=True):
+        """
+        Check out an idle worker (an AetherLink instance).
+        Returns None if `blocking` is False or `timeout` expires and no worker is free.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AetherLinkPool is closed")
+            if not self._idle and not blocking:
+                return None
+
+            self._waiting += 1
+            try:
+                ready = self._cond.wait_for(lambda: self._idle or self._closed, timeout=timeout)
+            finally:
+                self._waiting -= 1
+
+            if self._closed:
+                raise RuntimeError("AetherLinkPool is closed")
+            if not ready:
+                return None
+
+            slot = self._idle.pop(0)
+            slot.busy = True
+            slot.busy_since = time.time()
+            slot.messages_at_checkout = slot.link.messages_sent
+            return slot.link
+
+    def release(self, link):
+        """Return a worker to the pool"""
+        with self._cond:
+            slot = self._slot_for(link)
+            if not slot.busy:
+                return
+            slot.busy = False
+            slot.busy_total += time.time() - slot.busy_since
+            slot.busy_since = None
+            # Whatever was sent while checked out, through any API
+            slot.messages += slot.link.messages_sent - slot.messages_at_checkout
+            self._idle.append(slot)
+            if self._closed:
+                # close() is waiting for the last busy worker
+                self._cond.notify_all()
+            else:
+                self._cond.notify()
+            listeners = list(self._release_listeners)
+        for listener in listeners:
+            listener()
+
+    def add_release_listener(self, listener):
+        """Call `listener()` (from the releasing thread) whenever a worker becomes idle"""
+        with self._cond:
+            self._release_listeners.append(listener)
+
+    @contextmanager
+    def worker(self, timeout=None):
+        """Context manager: `with pool.worker() as bot: bot.send_message(...)`"""
+        link = self.acquire(timeout=timeout)
+        if link is None:
+            raise TimeoutError("No AetherLink worker became available in time")
+        try:
+            yield link
+        finally:
+            self.release(link)
+
+    # -----------------------
+    # Messaging
+    # -----------------------
+    def send_message(self, message, timeout=None):
+        """Send a message on the next free worker (blocks until one is free)"""
+        with self.worker(timeout=timeout) as link:
+            return link.send_message(message)
+
+    def submit(self, message):
+        """Queue a message and return a concurrent.futures.Future for its response"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AetherLinkPool is closed")
+            self._queued += 1
+
+        def run():
+            with self._cond:
+                self._queued -= 1
+            return self.send_message(message)
+
+        return self._executor.submit(run)
+
+    def map(self, messages):
+        """Send many messages concurrently, returning responses in order"""
+        futures = [self.submit(message) for message in messages]
+        return [future.result() for future in futures]
+
+    # -----------------------
+    # Sizing stats
+    # -----------------------
+    def get_stats(self):
+        """Pool size, queue depth and per-worker utilisation"""
+        now = time.time()
+        with self._cond:
+            workers = []
+            for slot in self._slots:
+                busy = slot.busy_total + (now - slot.busy_since if slot.busy else 0.0)
+                uptime = max(now - slot.started_at, 1e-9)
+                workers.append({
+                    'index': slot.index,
+                    'busy': slot.busy,
+                    'messages': slot.messages,
+                    'utilisation': busy / uptime,
+                })
+            busy_count = sum(1 for slot in self._slots if slot.busy)
+            return {
+                'size': len(self._slots),
+                'busy': busy_count,
+                'idle': len(self._idle),
+                'queue_depth': self._waiting + self._queued,
+                'utilisation': (sum(w['utilisation'] for w in workers) / len(workers)) if workers else 0.0,
+                'workers': workers,
+            }
+
+    def close(self):
+        """
+        Close every worker browser. Queued submit() jobs are cancelled; messages already
+        running (submitted, or on a worker checked out with acquire()/worker()) finish
+        first, so no browser is closed under a call.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._cond:
+            self._cond.wait_for(lambda: not any(slot.busy for slot in self._slots))
+        for slot in self._slots:
+            slot.link.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
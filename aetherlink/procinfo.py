@@ -0,0 +1,85 @@
+"""
+AetherLink Process Info
+
+Resident memory of a browser's whole process tree (chromedriver, Chrome and
+all its renderer/GPU/utility children). Uses psutil when it is installed and
+reads /proc directly otherwise; returns None where neither works.
+"""
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _proc_children():
+    """{ppid: [pid, ...]} for every process in /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read().decode('utf-8', 'replace')
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses, fields start after the last ')'
+        fields = stat[stat.rfind(')') + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def process_tree(pid):
+    """pid and all its descendants"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return [pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return []
+    if not os.path.isdir('/proc'):
+        return []
+    children = _proc_children()
+    tree, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        tree.append(current)
+        todo.extend(children.get(current, []))
+    return tree
+
+
+def tree_rss(pid):
+    """
+    Total resident memory of `pid` and its descendants.
+
+    Returns:
+        dict: {'rss_bytes', 'processes'}, or None if it cannot be measured here
+    """
+    if pid is None:
+        return None
+    pids = process_tree(pid)
+    if not pids:
+        return None
+
+    total = 0
+    for current in pids:
+        if psutil is not None:
+            try:
+                total += psutil.Process(current).memory_info().rss
+            except psutil.Error:
+                pass
+        else:
+            total += _proc_rss(current)
+    return {'rss_bytes': total, 'processes': len(pids)}
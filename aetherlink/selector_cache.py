@@ -0,0 +1,106 @@
+"""
+AetherLink Selector Cache
+
+Remembers which CSS selector located an element and keeps the element
+itself until it goes stale. A cold lookup tries every selector in a single
+script call (learned winner first), so a UI change only costs one extra
+round trip before the new selector is learned. Generic fallback selectors
+are tried last and never learned or cached, so a lucky match on the wrong
+element does not stick.
+"""
+
+# Returns [element, selector] for the first usable match, or null
+_RESOLVE_JS = """
+var selectors = arguments[0];
+function usable(el) {
+    return el.isConnected && !el.disabled && el.getAttribute('aria-disabled') !== 'true'
+        && (el.offsetParent !== null || el.getClientRects().length > 0);
+}
+for (var i = 0; i < selectors.length; i++) {
+    var nodes;
+    try {
+        nodes = document.querySelectorAll(selectors[i]);
+    } catch (e) {
+        continue;
+    }
+    for (var j = 0; j < nodes.length; j++) {
+        if (usable(nodes[j])) {
+            return [nodes[j], selectors[i]];
+        }
+    }
+}
+return null;
+"""
+
+_STILL_USABLE_JS = """
+var el = arguments[0];
+return el.isConnected && !el.disabled && el.getAttribute('aria-disabled') !== 'true'
+    && (el.offsetParent !== null || el.getClientRects().length > 0);
+"""
+
+
+class SelectorCache:
+    def __init__(self, name, selectors, fallbacks=()):
+        """
+        Args:
+            name (str): What is being looked up, used in log messages
+            selectors (list): CSS selectors in order of preference
+            fallbacks (list): Generic selectors tried after all of `selectors`; never learned
+        """
+        self.name = name
+        self.selectors = list(selectors)
+        self.fallbacks = list(fallbacks)
+        self.learned = None
+        self.element = None
+        self.stats = {'hits': 0, 'lookups': 0, 'relearned': 0, 'stale': 0, 'fallbacks': 0}
+
+    def _ordered_selectors(self):
+        if self.learned is None:
+            return self.selectors + self.fallbacks
+        return [self.learned] + [sel for sel in self.selectors if sel != self.learned] + self.fallbacks
+
+    def invalidate(self):
+        """Forget the cached element (the learned selector is kept)"""
+        self.element = None
+
+    def cached(self, driver):
+        """The cached element if it is still attached and usable, else None"""
+        if self.element is None:
+            return None
+        try:
+            if driver.execute_script(_STILL_USABLE_JS, self.element):
+                self.stats['hits'] += 1
+                return self.element
+        except Exception:
+            # StaleElementReferenceException after a navigation or re-render
+            pass
+        self.stats['stale'] += 1
+        self.element = None
+        return None
+
+    def resolve(self, driver):
+        """
+        Return a usable element, from the cache or with one cold lookup script.
+
+        Returns None if nothing matches right now. Script errors are raised so the
+        caller can fall back to plain WebDriver lookups.
+        """
+        element = self.cached(driver)
+        if element is not None:
+            return element
+
+        self.stats['lookups'] += 1
+        found = driver.execute_script(_RESOLVE_JS, self._ordered_selectors())
+        if not found:
+            return None
+
+        element, selector = found
+        if selector in self.selectors:
+            if self.learned is not None and selector != self.learned:
+                self.stats['relearned'] += 1
+            self.learned = selector
+            self.element = element
+        else:
+            # A generic match may be the wrong element next time: use it once, keep nothing
+            self.stats['fallbacks'] += 1
+        return element
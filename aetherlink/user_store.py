@@ -0,0 +1,118 @@
+"""
+AetherLink User Store
+
+User context for many users: one row per (user, key) in SQLite, indexed by
+user, with the contexts of recently active users kept in an LRU cache.
+Switching users costs a dict lookup when the user is cached and one indexed
+query when not; a change writes only the keys it touched.
+
+get() hands out a copy of the cached context, so instances sharing a store
+never iterate a dict another thread is changing; save() merges the keys it
+wrote back into the cache. The cache is per process. Workers in other
+processes see each other's changes once a user is loaded again.
+"""
+from collections import OrderedDict
+import json
+import threading
+import time
+
+from aetherlink.persistence import requirements_path
+
+
+class SQLiteUserStore:
+    def __init__(self, path=None, cache_size=1024):
+        """
+        Args:
+            path (str): SQLite database file (default: user_contexts.db in AetherLink_Requirements)
+            cache_size (int): Users whose context is kept in memory (least recently used go first)
+        """
+        self.path = path or requirements_path("user_contexts.db")
+        self.cache_size = cache_size
+        self.stats = {'hits': 0, 'loads': 0, 'writes': 0}
+        self._cache = OrderedDict()  # user_id -> context dict
+        self._lock = threading.RLock()
+        import sqlite3
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS user_context (
+                user_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (user_id, key)
+            )""")
+        self._db.commit()
+
+    def get(self, user_id):
+        """A copy of the context dict of `user_id` ({} for a new user)"""
+        user_id = str(user_id)
+        with self._lock:
+            context = self._cache.get(user_id)
+            if context is not None:
+                self._cache.move_to_end(user_id)
+                self.stats['hits'] += 1
+                return dict(context)
+            # rowid order is insertion order; upserts keep a key's rowid
+            rows = self._db.execute("SELECT key, value FROM user_context WHERE user_id = ? ORDER BY rowid",
+                                    (user_id,)).fetchall()
+            context = {key: json.loads(value) for key, value in rows}
+            self.stats['loads'] += 1
+            self._remember(user_id, context)
+            return dict(context)
+
+    def _remember(self, user_id, context):
+        self._cache[user_id] = context
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def save(self, user_id, context, keys=None):
+        """
+        Write the given keys of `context` (missing ones are deleted) or, without keys,
+        replace everything stored for `user_id`. Other keys of the cached context are
+        left alone, so callers holding older copies do not undo each other's changes.
+        """
+        user_id = str(user_id)
+        now = time.time()
+        with self._lock:
+            replace = keys is None
+            with self._db:
+                if replace:
+                    self._db.execute("DELETE FROM user_context WHERE user_id = ?", (user_id,))
+                    keys = list(context)
+                for key in keys:
+                    if key in context:
+                        self._db.execute(
+                            "INSERT INTO user_context (user_id, key, value, updated) VALUES (?, ?, ?, ?) "
+                            "ON CONFLICT (user_id, key) DO UPDATE SET value = excluded.value, updated = excluded.updated",
+                            (user_id, key, json.dumps(context[key], ensure_ascii=False), now))
+                    else:
+                        self._db.execute("DELETE FROM user_context WHERE user_id = ? AND key = ?", (user_id, key))
+            self.stats['writes'] += 1
+            cached = self._cache.get(user_id)
+            if replace or cached is not None:
+                # Not cached: the next get() loads the merged rows from disk
+                merged = {} if replace else cached
+                for key in keys:
+                    if key in context:
+                        merged[key] = context[key]
+                    else:
+                        merged.pop(key, None)
+                self._remember(user_id, merged)
+
+    def delete_user(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            with self._db:
+                self._db.execute("DELETE FROM user_context WHERE user_id = ?", (user_id,))
+            self._cache.pop(user_id, None)
+
+    def users(self):
+        with self._lock:
+            return [row[0] for row in self._db.execute("SELECT DISTINCT user_id FROM user_context")]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,88 @@
+"""
+AetherLink Readiness Waits
+
+Replaces fixed sleeps with polling of real readiness conditions. Every wait
+returns as soon as its condition holds and gives up at the caller's upper
+bound. Observed durations are remembered per host, so the poll interval
+follows how fast the page usually is.
+"""
+import threading
+import time
+
+
+class ReadinessWaiter:
+    # Learned timings are shared by every instance (pool workers learn together)
+    _timings = {}
+    _timings_lock = threading.Lock()
+
+    def __init__(self, host, min_interval=0.02, max_interval=0.25, smoothing=0.2):
+        """
+        Args:
+            host (str): Host the timings belong to (e.g. "chat.deepseek.com")
+            min_interval (float): Fastest poll interval in seconds
+            max_interval (float): Slowest poll interval in seconds
+            smoothing (float): Weight of a new sample in the moving average
+        """
+        self.host = host
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+
+    def _stats(self, name):
+        return self._timings.setdefault((self.host, name), {
+            'typical': None, 'samples': 0, 'timeouts': 0, 'last': None
+        })
+
+    def typical(self, name):
+        """Moving average of how long `name` took to become ready, or None if never seen"""
+        with self._timings_lock:
+            return self._stats(name)['typical']
+
+    def _interval(self, name):
+        typical = self.typical(name)
+        if typical is None:
+            return self.min_interval * 2
+        # Poll roughly ten times within the usual wait
+        return min(self.max_interval, max(self.min_interval, typical / 10))
+
+    def _record(self, name, elapsed, timed_out=False):
+        with self._timings_lock:
+            stats = self._stats(name)
+            stats['last'] = elapsed
+            if timed_out:
+                stats['timeouts'] += 1
+                return
+            stats['samples'] += 1
+            if stats['typical'] is None:
+                stats['typical'] = elapsed
+            else:
+                stats['typical'] += self.smoothing * (elapsed - stats['typical'])
+
+    def wait(self, name, condition, timeout, ignored_exceptions=(Exception,)):
+        """
+        Poll `condition` until it returns something truthy or `timeout` seconds pass.
+
+        Returns:
+            The first truthy result of condition(), or None on timeout
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        interval = self._interval(name)
+        while True:
+            try:
+                result = condition()
+            except ignored_exceptions:
+                result = None
+            now = time.monotonic()
+            if result:
+                self._record(name, now - start)
+                return result
+            if now >= deadline:
+                self._record(name, now - start, timed_out=True)
+                return None
+            time.sleep(min(interval, deadline - now))
+
+    def get_timings(self):
+        """Learned timings for this host: {condition: {typical, samples, timeouts, last}}"""
+        with self._timings_lock:
+            return {name: dict(stats) for (host, name), stats in self._timings.items() if host == self.host}
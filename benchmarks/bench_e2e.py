@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AetherLink Benchmark - End to End
+
+Runs AetherLink against the local mock DeepSeek page (mock_server.py)
+and measures:
+  * send_message  - end-to-end latency of plain messages, with per-phase medians
+  * extraction    - reading the newest reply: in-page script vs BeautifulSoup
+  * reprompt      - messages whose reply carries a command tag, which costs a
+                    second prompt and a second streamed reply
+
+Usage: python benchmarks/bench_e2e.py [--messages 10] [--capture-mode poll]
+                                      [--token-delay 0.01] [--reply-words 60]
+No DeepSeek account is needed, but a working Chrome is.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aetherlink.aetherlink import AetherLink
+from aetherlink.metrics import Metrics, PHASES
+from mock_server import MockDeepSeekServer
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def report(label, samples_ms):
+    print(f"{label:<34} median {statistics.median(samples_ms):8.1f} ms   "
+          f"p95 {percentile(samples_ms, 95):8.1f} ms")
+
+
+def report_phases(metrics):
+    snapshot = metrics.snapshot()
+    for phase in PHASES:
+        if phase in snapshot and snapshot[phase]['count']:
+            print(f"    {phase:<22} p50 {snapshot[phase]['p50'] * 1000:8.1f} ms   "
+                  f"p99 {snapshot[phase]['p99'] * 1000:8.1f} ms")
+
+
+def run_messages(link, count, label):
+    link.metrics = Metrics()
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = link.send_message(f"Benchmark message {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.startswith("Error:"):
+            raise RuntimeError(response)
+    report(label, latencies)
+    report_phases(link.metrics)
+    return latencies
+
+
+def bench_extraction(link, repeat=30):
+    js, soup = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        link._extract_latest_via_js()
+        js.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        link._extract_latest_via_soup()
+        soup.append((time.perf_counter() - start) * 1000)
+    report("extraction: in-page script", js)
+    report("extraction: BeautifulSoup", soup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10)
+    parser.add_argument('--capture-mode', default="poll", choices=["poll", "observer", "network"])
+    parser.add_argument('--token-delay', type=float, default=0.01)
+    parser.add_argument('--first-token-delay', type=float, default=0.2)
+    parser.add_argument('--reply-words', type=int, default=60)
+    parser.add_argument('--spa-new-chat', action='store_true')
+    parser.add_argument('--show-browser', action='store_true')
+    args = parser.parse_args()
+
+    server = MockDeepSeekServer(token_delay=args.token_delay, first_token_delay=args.first_token_delay,
+                                reply_words=args.reply_words)
+    server.start()
+    print(f"Mock DeepSeek on {server.url}, {args.reply_words} words per reply, "
+          f"{args.token_delay * 1000:.0f} ms per token, capture_mode={args.capture_mode}\n")
+
+    link = None
+    try:
+        link = AetherLink(headless=not args.show_browser, verbose=False, base_url=server.url,
+                          capture_mode=args.capture_mode, spa_new_chat=args.spa_new_chat)
+        if not link.is_logged_in():
+            raise RuntimeError("mock page did not load")
+
+        plain = run_messages(link, args.messages, "send_message")
+        print()
+        bench_extraction(link)
+        print()
+
+        server.command_tag = "<!get_all_user_context>"
+        with_commands = run_messages(link, args.messages, "send_message with a command")
+        print(f"\nreprompt cost: {statistics.median(with_commands) - statistics.median(plain):+.1f} ms "
+              f"per message (median)")
+        print(f"server: {server.stats}")
+    except Exception as e:
+        print(f"Browser benchmark skipped: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+    finally:
+        if link is not None:
+            link.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
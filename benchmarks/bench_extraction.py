@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+AetherLink Benchmark - Response Extraction
+
+Compares the two get_latest_response_text paths on a large synthetic conversation:
+  * js   - one execute_script call that converts only the newest message
+  * soup - driver.page_source + BeautifulSoup over the whole DOM (fallback path)
+
+Usage: python benchmarks/bench_extraction.py [--turns 200] [--repeat 30]
+Without a working Chrome, only the offline BeautifulSoup parse cost is measured.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aetherlink.aetherlink import AetherLink
+
+
+def build_conversation_html(turns):
+    """Build a DeepSeek-like page with `turns` user/assistant message pairs"""
+    parts = ['<html><body><div class="ds-scroll-area">']
+    for i in range(turns):
+        parts.append(f'<div class="ds-message"><div class="user-text">Question number {i}, tell me about item {i}.</div></div>')
+        parts.append(
+            '<div class="ds-message"><div class="ds-markdown">'
+            f'<h3>Answer {i}</h3>'
+            + ''.join(f'<p>Paragraph {j} of answer {i} with <strong>bold</strong> and <code>inline()</code> text.</p>' for j in range(6))
+            + '<ul>' + ''.join(f'<li>Point {j}</li>' for j in range(5)) + '</ul>'
+            + '<pre><code class="language-python">' + '\n'.join(f'value_{j} = compute({j})' for j in range(12)) + '</code></pre>'
+            + '</div></div>'
+        )
+    parts.append('</div><div class="ds-scroll-area__gutters"></div></body></html>')
+    return ''.join(parts)
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{label:<28} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def bench_offline(html, repeat):
+    from bs4 import BeautifulSoup
+
+    link = AetherLink.__new__(AetherLink)
+    link.verbose = False
+
+    def soup_only():
+        soup = BeautifulSoup(html, 'html.parser')
+        messages = soup.find_all(class_=lambda x: x and 'ds-message' in x)
+        return link._extract_ordered_text(messages[-1])
+
+    _, samples = timed(soup_only, repeat)
+    report("soup (parse only)", samples)
+
+
+def bench_browser(html, repeat, headless=True):
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    driver = webdriver.Chrome(options=options)
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as f:
+        f.write(html)
+        path = f.name
+
+    try:
+        driver.get('file://' + path)
+        link = AetherLink.__new__(AetherLink)
+        link.verbose = False
+        link.driver = driver
+
+        js_text, js_samples = timed(link._extract_latest_via_js, repeat)
+        soup_text, soup_samples = timed(link._extract_latest_via_soup, repeat)
+        report("js (newest message only)", js_samples)
+        report("soup (page_source + parse)", soup_samples)
+        print(f"\nspeed-up: {statistics.median(soup_samples) / max(statistics.median(js_samples), 1e-9):.1f}x")
+        print(f"js output keeps structure: {js_text.count(chr(10))} newlines, "
+              f"soup output: {soup_text.count(chr(10))} newlines")
+    finally:
+        driver.quit()
+        os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=200, help='user/assistant pairs in the page')
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--show-browser', action='store_true')
+    args = parser.parse_args()
+
+    html = build_conversation_html(args.turns)
+    print(f"Conversation: {args.turns} turns, {len(html) / 1024:.0f} KB of HTML\n")
+
+    bench_offline(html, args.repeat)
+    try:
+        bench_browser(html, args.repeat, headless=not args.show_browser)
+    except Exception as e:
+        print(f"\nBrowser benchmark skipped: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+AetherLink Benchmark - Lean Mode
+
+Starts fresh browsers with and without lean=True and measures, per run:
+  * load  - driver.get() until the page is ready and the input box is found
+  * rss   - resident memory of the whole browser process tree after the load
+
+Usage: python benchmarks/bench_lean.py [--runs 5] [--url https://chat.deepseek.com]
+Needs a working Chrome; without a saved session DeepSeek shows its login page,
+which still gives a fair load/RSS comparison (the input box step is then skipped).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aetherlink.aetherlink import AetherLink
+
+
+def measure(url, lean, show_browser=False):
+    link = AetherLink(headless=not show_browser, verbose=False, base_url=url,
+                      install_default_commands=False, lean=lean)
+    try:
+        start = time.perf_counter()
+        link.driver.get(link.base_url)
+        link._wait_page_ready(timeout=30)
+        try:
+            link.find_input_box(timeout=10)
+        except Exception:
+            pass
+        load = time.perf_counter() - start
+        memory = link.get_memory_usage()
+        return load * 1000, memory['rss_bytes'] / 2 ** 20 if memory else None
+    finally:
+        link.close()
+
+
+def report(label, loads, rss):
+    line = f"{label:<8} load median {statistics.median(loads):8.0f} ms"
+    if rss:
+        line += f"   rss median {statistics.median(rss):7.0f} MB"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--url', default="https://chat.deepseek.com")
+    parser.add_argument('--show-browser', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        for label, lean in (("default", False), ("lean", True)):
+            loads, rss = [], []
+            for _ in range(args.runs):
+                load, memory = measure(args.url, lean, args.show_browser)
+                loads.append(load)
+                if memory is not None:
+                    rss.append(memory)
+            results[label] = (loads, rss)
+            report(label, loads, rss)
+    except Exception as e:
+        print(f"\nBrowser benchmark skipped: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+        return
+
+    (base_loads, base_rss), (lean_loads, lean_rss) = results["default"], results["lean"]
+    print(f"\nload: {statistics.median(lean_loads) / statistics.median(base_loads) - 1:+.0%}", end="")
+    if base_rss and lean_rss:
+        print(f"   rss: {statistics.median(lean_rss) / statistics.median(base_rss) - 1:+.0%}", end="")
+    print()
+
+
+if __name__ == "__main__":
+    main()
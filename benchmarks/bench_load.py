@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+AetherLink Benchmark - Load / Soak
+
+Simulates N concurrent users against an AetherLinkPool for a fixed duration.
+Every user is a thread with its own id, conversation, message sequence and
+think time between messages. By default the pool talks to a local mock
+DeepSeek (mock_server.py); pass --url to use a different backend.
+
+Every --interval seconds one row shows throughput, latency percentiles,
+errors, browser restarts and the memory of all browsers. A summary follows
+at the end, and --json saves everything.
+
+Usage: python benchmarks/bench_load.py [--users 8] [--workers 4] [--duration 300]
+                                       [--think-time 2] [--stream] [--recycle-after 100]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aetherlink.history import InMemoryHistory
+from aetherlink.lifecycle import BrowserLifecycle
+from aetherlink.pool import AetherLinkPool
+from mock_server import MockDeepSeekServer
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def fmt_ms(value):
+    return "      -" if value is None else f"{value * 1000:7.0f}"
+
+
+class LoadRun:
+    def __init__(self, pool, users, duration, think_time, stream=False):
+        self.pool = pool
+        self.users = users
+        self.duration = duration
+        self.think_time = think_time
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.results = []  # (finished_at, user, latency, ok, error)
+        self.stop = threading.Event()
+        self.started = None
+
+    def restarts(self):
+        return sum(link.lifecycle_stats['restarts'] + link.lifecycle_stats['resurrections']
+                   for link in self.pool.links)
+
+    def memory_mb(self):
+        total, measured = 0, False
+        for link in self.pool.links:
+            usage = link.get_memory_usage()
+            if usage is not None:
+                total += usage['rss_bytes']
+                measured = True
+        return total / 2 ** 20 if measured else None
+
+    def send(self, user_id, text):
+        with self.pool.worker() as link:
+            # Each user keeps its own conversation, whichever worker serves it
+            link.switch_conversation(f"user-{user_id}")
+            if not self.stream:
+                return link.send_message(text)
+            stream = link.send_message_stream(text)
+            while True:
+                try:
+                    next(stream)
+                except StopIteration as done:
+                    return done.value
+
+    def user(self, user_id):
+        rng = random.Random(user_id)
+        # Spread the first messages out instead of starting every user at once
+        self.stop.wait(rng.uniform(0, self.think_time))
+        sequence = 0
+        while not self.stop.is_set():
+            sequence += 1
+            start = time.perf_counter()
+            ok, error = True, None
+            try:
+                response = self.send(user_id, f"User {user_id} message {sequence}: how are you today?")
+                if not response or response.startswith("Error:"):
+                    ok, error = False, (response or "empty response")[:120]
+            except Exception as e:
+                ok, error = False, f"{e.__class__.__name__}: {e}"[:120]
+            latency = time.perf_counter() - start
+            with self.lock:
+                self.results.append((time.time(), user_id, latency, ok, error))
+            # Exponential think time, like independent users
+            self.stop.wait(rng.expovariate(1 / self.think_time) if self.think_time > 0 else 0)
+
+    def window(self, since):
+        with self.lock:
+            return [r for r in self.results if r[0] >= since]
+
+    def run(self, interval):
+        self.started = time.time()
+        threads = [threading.Thread(target=self.user, args=(i,), daemon=True) for i in range(self.users)]
+        for thread in threads:
+            thread.start()
+
+        timeline = []
+        memory_start = self.memory_mb()
+        print(f"{'t(s)':>6} {'done':>6} {'msg/s':>6} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+              f"{'errors':>6} {'restarts':>8} {'rss MB':>7}")
+        last = self.started
+        while time.time() - self.started < self.duration:
+            self.stop.wait(min(interval, self.duration - (time.time() - self.started)))
+            now = time.time()
+            rows = self.window(last)
+            latencies = [r[2] for r in rows if r[3]]
+            row = {
+                't': now - self.started,
+                'completed': len(rows),
+                'throughput': len(rows) / max(now - last, 1e-9),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'errors': sum(1 for r in rows if not r[3]),
+                'restarts': self.restarts(),
+                'rss_mb': self.memory_mb(),
+            }
+            timeline.append(row)
+            rss = "      -" if row['rss_mb'] is None else f"{row['rss_mb']:7.0f}"
+            print(f"{row['t']:6.1f} {row['completed']:6d} {row['throughput']:6.2f} {fmt_ms(row['p50'])} "
+                  f"{fmt_ms(row['p95'])} {fmt_ms(row['p99'])} {row['errors']:6d} {row['restarts']:8d} {rss}")
+            last = now
+
+        self.stop.set()
+        for thread in threads:
+            # Let in-flight messages finish so their latency is counted
+            thread.join(timeout=120)
+        return self.summary(timeline, memory_start)
+
+    def summary(self, timeline, memory_start):
+        elapsed = time.time() - self.started
+        with self.lock:
+            results = list(self.results)
+        latencies = [r[2] for r in results if r[3]]
+        errors = [r for r in results if not r[3]]
+        memory_end = self.memory_mb()
+        error_kinds = {}
+        for r in errors:
+            error_kinds[r[4]] = error_kinds.get(r[4], 0) + 1
+        return {
+            'users': self.users,
+            'workers': len(self.pool.links),
+            'duration': elapsed,
+            'requests': len(results),
+            'throughput': len(results) / elapsed if elapsed else 0.0,
+            'latency': {
+                'mean': statistics.mean(latencies) if latencies else None,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies) if latencies else None,
+            },
+            'error_rate': len(errors) / len(results) if results else 0.0,
+            'errors': error_kinds,
+            'browser_restarts': self.restarts(),
+            'memory_mb': {
+                'start': memory_start,
+                'end': memory_end,
+                'growth': memory_end - memory_start if memory_start is not None and memory_end is not None else None,
+            },
+            'timeline': timeline,
+        }
+
+
+def print_summary(summary):
+    latency = summary['latency']
+    memory = summary['memory_mb']
+    print(f"\n{summary['requests']} messages from {summary['users']} users on {summary['workers']} browsers "
+          f"in {summary['duration']:.0f}s: {summary['throughput']:.2f} msg/s")
+    print(f"latency  p50 {fmt_ms(latency['p50'])} ms   p95 {fmt_ms(latency['p95'])} ms   "
+          f"p99 {fmt_ms(latency['p99'])} ms   max {fmt_ms(latency['max'])} ms")
+    print(f"errors   {summary['error_rate']:.1%}" + "".join(
+        f"\n         {count} x {kind}" for kind, count in summary['errors'].items()))
+    print(f"restarts {summary['browser_restarts']}")
+    if memory['start'] is not None and memory['end'] is not None:
+        print(f"memory   {memory['start']:.0f} MB -> {memory['end']:.0f} MB ({memory['growth']:+.0f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4, help='AetherLink browsers in the pool')
+    parser.add_argument('--duration', type=float, default=300, help='seconds')
+    parser.add_argument('--think-time', type=float, default=2.0, help='mean seconds between a user\'s messages')
+    parser.add_argument('--interval', type=float, default=10, help='seconds between report rows')
+    parser.add_argument('--stream', action='store_true', help='use send_message_stream (the streaming path)')
+    parser.add_argument('--capture-mode', default="poll", choices=["poll", "observer", "network"])
+    parser.add_argument('--url', default=None, help='backend to use instead of the local mock')
+    parser.add_argument('--token-delay', type=float, default=0.01)
+    parser.add_argument('--reply-words', type=int, default=60)
+    parser.add_argument('--recycle-after', type=int, default=None, help='recycle browsers after N messages')
+    parser.add_argument('--max-rss-mb', type=float, default=None, help='recycle browsers above this RSS')
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--json', default=None, help='write the summary and timeline to this file')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = MockDeepSeekServer(token_delay=args.token_delay, reply_words=args.reply_words)
+        url = server.start()
+    print(f"Load: {args.users} users, {args.workers} browsers, {args.duration:.0f}s against {url}\n")
+
+    pool = lifecycle = None
+    try:
+        pool = AetherLinkPool(size=args.workers, headless=True, verbose=False, load_session=args.url is not None,
+                              base_url=url, capture_mode=args.capture_mode, lean=args.lean,
+                              history_store=InMemoryHistory())
+        if args.recycle_after or args.max_rss_mb:
+            lifecycle = BrowserLifecycle(pool, max_messages=args.recycle_after, max_rss_mb=args.max_rss_mb,
+                                         check_interval=min(args.interval, 5)).start()
+        summary = LoadRun(pool, args.users, args.duration, args.think_time, args.stream).run(args.interval)
+        print_summary(summary)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            print(f"\nSaved to {args.json}")
+    except Exception as e:
+        print(f"Load test skipped: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+    finally:
+        if lifecycle is not None:
+            lifecycle.stop()
+        if pool is not None:
+            pool.close()
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+AetherLink Benchmark - Start-up
+
+Measures what a CLI tool or worker pays before it can do anything:
+  * import   - fresh interpreter running `import aetherlink.aetherlink`, compared
+               with also importing selenium and bs4 (the old eager imports)
+  * construct - AetherLink() with a blocking start versus background_start=True
+               (time until the constructor returns, and until the browser is ready)
+
+Usage: python benchmarks/bench_startup.py [--runs 10]
+Without a working Chrome, only the import times are measured.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+
+def time_import(statement, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], cwd=ROOT, check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label:<34} median {statistics.median(samples):8.0f} ms")
+
+
+def bench_imports(runs):
+    lazy = time_import("import aetherlink.aetherlink, sys; assert 'selenium' not in sys.modules", runs)
+    eager = time_import("import aetherlink.aetherlink, selenium.webdriver, bs4", runs)
+    report("import (lazy)", lazy)
+    report("import + selenium + bs4", eager)
+
+
+def bench_construct(runs, show_browser=False):
+    from aetherlink.aetherlink import AetherLink
+
+    blocking, returned, ready = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        link = AetherLink(headless=not show_browser, verbose=False, install_default_commands=False)
+        blocking.append((time.perf_counter() - start) * 1000)
+        link.close()
+
+        start = time.perf_counter()
+        link = AetherLink(headless=not show_browser, verbose=False, install_default_commands=False,
+                          background_start=True)
+        returned.append((time.perf_counter() - start) * 1000)
+        try:
+            link.wait_until_ready()
+            ready.append((time.perf_counter() - start) * 1000)
+        finally:
+            link.close()
+
+    report("AetherLink() blocking", blocking)
+    report("background_start: returned", returned)
+    report("background_start: browser ready", ready)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--show-browser', action='store_true')
+    args = parser.parse_args()
+
+    bench_imports(args.runs)
+    print()
+    try:
+        bench_construct(max(1, args.runs // 3), args.show_browser)
+    except Exception as e:
+        print(f"Browser benchmark skipped: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+AetherLink Mock DeepSeek
+
+A local stand-in for chat.deepseek.com, for benchmarks and offline runs. The
+page copies the DOM AetherLink relies on: the "Message DeepSeek" textarea, a
+send button, ds-scroll-area / ds-message / ds-markdown, a stop control while
+streaming and a copy/regenerate bar once a reply is done. Replies stream
+token by token from an SSE endpoint (OpenAI-style chunks) at a configurable
+speed and can carry command tags to exercise the reprompt path.
+
+    python benchmarks/mock_server.py --port 8765 --token-delay 0.02
+
+    with MockDeepSeekServer(token_delay=0.01) as server:
+        aether = AetherLink(base_url=server.url)
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("aetherlink.mock_server")
+
+_FILLER = (
+    "The quick brown fox jumps over the lazy dog while the benchmark keeps counting "
+    "tokens as they arrive from the local mock server without any network latency"
+).split()
+
+_PAGE = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>DeepSeek (mock)</title>
+<style>
+body { font-family: sans-serif; margin: 0; display: flex; height: 100vh; }
+.sidebar { width: 200px; background: #f3f4f6; padding: 8px; }
+.main { flex: 1; display: flex; flex-direction: column; }
+.chat { flex: 1; overflow-y: auto; padding: 16px; }
+.ds-message { margin: 8px 0; }
+.user-text { background: #eef; padding: 8px; border-radius: 8px; }
+.composer { display: flex; padding: 8px; gap: 8px; }
+textarea { flex: 1; height: 60px; }
+.hidden { display: none; }
+</style>
+</head>
+<body>
+<div class="sidebar ds-scroll-area">
+  <div class="ds-scroll-area__gutters"></div>
+  <a href="/" class="new-chat" id="new-chat">New chat</a>
+</div>
+<div class="main">
+  <div class="chat ds-scroll-area" id="chat"></div>
+  <div class="composer">
+    <textarea id="prompt" placeholder="Message DeepSeek"></textarea>
+    <button id="stop" class="stop-button hidden" aria-label="Stop">&#9632;</button>
+    <button id="send" class="ds-icon-button ds-icon-button--disabled" aria-label="Send" aria-disabled="true" disabled>&#8593;</button>
+  </div>
+</div>
+<script>
+(function () {
+    var chat = document.getElementById('chat');
+    var prompt = document.getElementById('prompt');
+    var send = document.getElementById('send');
+    var stop = document.getElementById('stop');
+    var chatId = (location.pathname.match(/\/a\/chat\/s\/([^\/]+)/) || [])[1] || null;
+    var controller = null;
+
+    function escapeHtml(text) {
+        return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+    }
+
+    function render(text) {
+        var html = '';
+        var parts = text.split('```');
+        for (var i = 0; i < parts.length; i++) {
+            if (i % 2 === 1) {
+                var lines = parts[i].split('\n');
+                var lang = lines.shift().trim();
+                html += '<pre><code' + (lang ? ' class="language-' + lang + '"' : '') + '>'
+                    + escapeHtml(lines.join('\n')) + '</code></pre>';
+                continue;
+            }
+            parts[i].split(/\n{2,}/).forEach(function (block) {
+                if (block.trim()) {
+                    html += '<p>' + escapeHtml(block.trim()).replace(/\n/g, '<br>') + '</p>';
+                }
+            });
+        }
+        return html;
+    }
+
+    function setSendEnabled() {
+        var enabled = !!prompt.value.trim() && !controller;
+        send.disabled = !enabled;
+        send.setAttribute('aria-disabled', enabled ? 'false' : 'true');
+        send.className = 'ds-icon-button' + (enabled ? '' : ' ds-icon-button--disabled');
+    }
+
+    function addMessage(html, assistant) {
+        var node = document.createElement('div');
+        node.className = 'ds-message' + (assistant ? ' streaming' : '');
+        node.innerHTML = html;
+        chat.appendChild(node);
+        chat.scrollTop = chat.scrollHeight;
+        return node;
+    }
+
+    function finish(message) {
+        controller = null;
+        message.className = 'ds-message';
+        stop.classList.add('hidden');
+        var actions = document.createElement('div');
+        actions.className = 'message-actions';
+        actions.innerHTML = '<button aria-label="Copy">Copy</button><button aria-label="Regenerate">Regenerate</button>';
+        message.appendChild(actions);
+        setSendEnabled();
+        if (chatId && location.pathname.indexOf(chatId) === -1) {
+            history.pushState({}, '', '/a/chat/s/' + chatId);
+        }
+    }
+
+    function submit() {
+        var text = prompt.value;
+        if (!text.trim() || controller) {
+            return;
+        }
+        chatId = chatId || Math.random().toString(36).slice(2, 10);
+        addMessage('<div class="user-text">' + escapeHtml(text) + '</div>', false);
+        prompt.value = '';
+        // Like DeepSeek, the reply node only appears with the first token
+        var message = null;
+        var markdown = null;
+        function replyNode() {
+            if (!message) {
+                message = addMessage('<div class="ds-markdown"></div>', true);
+                markdown = message.querySelector('.ds-markdown');
+            }
+            return message;
+        }
+        controller = new AbortController();
+        stop.classList.remove('hidden');
+        setSendEnabled();
+
+        var reply = '';
+        var buffer = '';
+        var decoder = new TextDecoder();
+        fetch('/api/v0/chat/completion', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({chat_session_id: chatId, prompt: text}),
+            signal: controller.signal
+        }).then(function (response) {
+            var reader = response.body.getReader();
+            function pump() {
+                return reader.read().then(function (chunk) {
+                    if (chunk.done) {
+                        return;
+                    }
+                    buffer += decoder.decode(chunk.value, {stream: true});
+                    var events = buffer.split('\n\n');
+                    buffer = events.pop();
+                    events.forEach(function (event) {
+                        var data = event.replace(/^data: ?/gm, '');
+                        if (!data || data === '[DONE]') {
+                            return;
+                        }
+                        var delta = ((JSON.parse(data).choices || [])[0] || {}).delta || {};
+                        if (delta.content) {
+                            reply += delta.content;
+                            replyNode();
+                            markdown.innerHTML = render(reply);
+                        }
+                    });
+                    return pump();
+                });
+            }
+            return pump();
+        }).catch(function () {}).then(function () {
+            finish(replyNode());
+        });
+    }
+
+    prompt.addEventListener('input', setSendEnabled);
+    prompt.addEventListener('keydown', function (event) {
+        if (event.key === 'Enter' && !event.shiftKey) {
+            event.preventDefault();
+            submit();
+        }
+    });
+    send.addEventListener('click', submit);
+    stop.addEventListener('click', function () {
+        if (controller) {
+            controller.abort();
+        }
+    });
+    document.getElementById('new-chat').addEventListener('click', function (event) {
+        event.preventDefault();
+        if (controller) {
+            controller.abort();
+        }
+        chat.innerHTML = '';
+        chatId = null;
+        history.pushState({}, '', '/');
+    });
+})();
+</script>
+</body>
+</html>
+"""
+
+
+class MockDeepSeekServer:
+    def __init__(self, host="127.0.0.1", port=0, token_delay=0.02, first_token_delay=0.3,
+                 reply_words=60, command_tag=None, responder=None):
+        """
+        Args:
+            host (str), port (int): Where to listen (port 0 picks a free one)
+            token_delay (float): Seconds between streamed tokens
+            first_token_delay (float): Seconds before the first token ("thinking")
+            reply_words (int): Length of the default replies
+            command_tag (str): If set (e.g. "<!get_all_user_context>"), every first reply
+                contains it, and the reprompt with the command results gets a plain answer
+            responder (callable): responder(prompt) -> reply text, replaces the default replies
+        """
+        self.host = host
+        self.port = port
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.reply_words = reply_words
+        self.command_tag = command_tag
+        self.responder = responder
+        self.stats = {'pages': 0, 'completions': 0, 'reprompts': 0, 'active': 0, 'tokens': 0}
+        self._stats_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self._server.server_port}" if self._server else None
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    # -----------------------
+    # Replies
+    # -----------------------
+    def reply_for(self, prompt):
+        """The full reply text for `prompt`"""
+        if self.responder:
+            return self.responder(prompt)
+
+        is_reprompt = "COMMAND EXECUTION RESULTS" in prompt
+        # The user's own words: the last "User: ... Assistant:" turn of the prompt
+        turns = re.findall(r"User(?:'s original message)?: (.*?)(?:\nAssistant:|\n\n|$)", prompt, re.S)
+        user_text = (turns[-1] if turns else prompt).strip()[:200]
+
+        words = [_FILLER[i % len(_FILLER)] for i in range(max(0, self.reply_words - 3))]
+        body = f"You said: {user_text}. " + " ".join(words) + "."
+        if is_reprompt:
+            self._count('reprompts')
+            return "Final answer. " + body
+        if self.command_tag:
+            return f"Let me check that. {self.command_tag} " + body
+        return body
+
+    def tokens(self, text):
+        """Split a reply into streamed tokens (a word with its trailing whitespace)"""
+        return re.findall(r"\S+\s*|\s+", text)
+
+    # -----------------------
+    # HTTP
+    # -----------------------
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/favicon.ico':
+                    self.send_error(404)
+                    return
+                mock._count('pages')
+                body = _PAGE.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if not self.path.startswith('/api/v0/chat/completion'):
+                    self.send_error(404)
+                    return
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self.send_error(400)
+                    return
+
+                mock._count('completions')
+                mock._count('active')
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Cache-Control', 'no-cache')
+                    self.end_headers()
+                    self._stream(mock.reply_for(request.get('prompt', '')))
+                except (BrokenPipeError, ConnectionResetError):
+                    # The page stopped the reply
+                    pass
+                finally:
+                    mock._count('active', -1)
+
+            def _event(self, payload):
+                self.wfile.write(f"data: {payload}\n\n".encode('utf-8'))
+                self.wfile.flush()
+
+            def _stream(self, reply):
+                reply_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                time.sleep(mock.first_token_delay)
+                for token in mock.tokens(reply):
+                    self._event(json.dumps({
+                        'id': reply_id,
+                        'object': 'chat.completion.chunk',
+                        'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}],
+                    }))
+                    mock._count('tokens')
+                    if mock.token_delay:
+                        time.sleep(mock.token_delay)
+                self._event(json.dumps({
+                    'id': reply_id,
+                    'object': 'chat.completion.chunk',
+                    'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                }))
+                self._event('[DONE]')
+
+        return Handler
+
+    def start(self):
+        """Start serving on a daemon thread, returns the base URL"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="aetherlink-mock", daemon=True)
+        self._thread.start()
+        logger.info(f"Mock DeepSeek serving on {self.url}")
+        return self.url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local mock of the DeepSeek chat page")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--token-delay', type=float, default=0.02)
+    parser.add_argument('--first-token-delay', type=float, default=0.3)
+    parser.add_argument('--reply-words', type=int, default=60)
+    parser.add_argument('--command-tag', default=None, help='e.g. "<!get_all_user_context>"')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+    server = MockDeepSeekServer(args.host, args.port, args.token_delay, args.first_token_delay,
+                                args.reply_words, args.command_tag)
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()